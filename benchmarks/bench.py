@@ -0,0 +1,256 @@
+"""Benchmarks for sanic-healthcheck probe latency and throughput.
+
+This measures the cost of running the health and readiness checkers as the
+number of registered checks grows, comparing synchronous and asynchronous
+checks, cached and uncached results, and the available response handlers.
+It also runs a load scenario, in which concurrent clients poll the health
+endpoint of a local Sanic server.
+
+Results are written as JSON, so that they can be compared between releases.
+
+Usage (with sanic_healthcheck importable, e.g. via ``make bench``):
+
+    python benchmarks/bench.py [--output FILE] [--quick] [--skip-load]
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import sanic
+
+import sanic_healthcheck
+from sanic_healthcheck import HealthCheck, ReadyCheck, handlers
+
+CHECK_COUNTS = (1, 10, 100, 1000)
+
+
+def make_checks(count, kind):
+    """Make a list of trivial passing checks of the given kind ('sync' or 'async')."""
+    checks = []
+    for i in range(count):
+        if kind == 'sync':
+            def check():
+                return True, 'ok'
+        else:
+            async def check():
+                return True, 'ok'
+        check.__name__ = f'check_{i}'
+        checks.append(check)
+    return checks
+
+
+def summarize(samples):
+    """Summarize a list of latency samples (in seconds)."""
+    samples = sorted(samples)
+    mean = statistics.mean(samples)
+    return {
+        'iterations': len(samples),
+        'mean_ms': mean * 1000,
+        'p50_ms': samples[len(samples) // 2] * 1000,
+        'p99_ms': samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000,
+        'rps': 1 / mean if mean else None,
+    }
+
+
+async def time_probe(checker, iterations):
+    """Time repeated calls to a checker's ``run`` method."""
+    # Warm up, populating any caches.
+    await checker.run(None)
+
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await checker.run(None)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def iterations_for(count, quick):
+    """The number of iterations to run for a given number of checks."""
+    total = 20000 if not quick else 2000
+    return max(20, total // count)
+
+
+async def bench_checkers(quick):
+    """Benchmark HealthCheck and ReadyCheck probe latency."""
+    results = []
+    for count in CHECK_COUNTS:
+        for kind in ('sync', 'async'):
+            for cached in (True, False):
+                checker = HealthCheck(checks=make_checks(count, kind), no_cache=not cached)
+                stats = await time_probe(checker, iterations_for(count, quick))
+                results.append(dict(checker='HealthCheck', checks=count, kind=kind, cached=cached, **stats))
+
+            for concurrent in (False, True):
+                checker = ReadyCheck(checks=make_checks(count, kind), concurrent=concurrent)
+                stats = await time_probe(checker, iterations_for(count, quick))
+                results.append(dict(checker='ReadyCheck', checks=count, kind=kind, concurrent=concurrent, **stats))
+
+            print(f'  checkers: {count} {kind} checks', file=sys.stderr)
+    return results
+
+
+def available_handlers():
+    """Get the success handlers to benchmark, by name."""
+    options = {
+        'none': None,
+        'json_success_handler': handlers.json_success_handler,
+        'make_json_success_handler[json]': handlers.make_json_success_handler(
+            lambda obj: json.dumps(obj).encode()),
+    }
+    if handlers.ujson is not None:
+        options['make_json_success_handler[ujson]'] = handlers.make_json_success_handler(
+            lambda obj: handlers.ujson.dumps(obj).encode())
+    if handlers.orjson is not None:
+        options['make_json_success_handler[orjson]'] = handlers.make_json_success_handler(
+            handlers.orjson.dumps)
+    return options
+
+
+async def bench_handlers(quick):
+    """Benchmark cached HealthCheck probe latency for each response handler."""
+    results = []
+    for count in CHECK_COUNTS:
+        for name, handler in available_handlers().items():
+            for cache_response in (False, True):
+                checker = HealthCheck(
+                    checks=make_checks(count, 'sync'),
+                    success_handler=handler,
+                    cache_response=cache_response,
+                )
+                stats = await time_probe(checker, iterations_for(count, quick))
+                results.append(dict(handler=name, checks=count, cache_response=cache_response, **stats))
+        print(f'  handlers: {count} checks', file=sys.stderr)
+    return results
+
+
+def serve(port, count):
+    """Run a Sanic server exposing a health check with the given number of checks."""
+    app = sanic.Sanic('sanic_healthcheck_bench')
+    HealthCheck(
+        app,
+        checks=make_checks(count, 'async'),
+        success_handler=handlers.make_json_success_handler(),
+    )
+
+    kwargs = dict(host='127.0.0.1', port=port, access_log=False)
+    if 'single_process' in inspect.signature(app.run).parameters:
+        kwargs['single_process'] = True
+    app.run(**kwargs)
+
+
+def free_port():
+    """Get a free local TCP port."""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port, timeout=15):
+    """Wait until a TCP port accepts connections."""
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'server did not start on port {port}')
+
+
+async def client(port, duration, samples):
+    """Poll the health endpoint over a keep-alive connection until the duration elapses."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    request = b'GET /health HTTP/1.1\r\nHost: localhost\r\n\r\n'
+    end = time.perf_counter() + duration
+    errors = 0
+    try:
+        while time.perf_counter() < end:
+            start = time.perf_counter()
+            writer.write(request)
+            headers = await reader.readuntil(b'\r\n\r\n')
+            length = 0
+            for line in headers.split(b'\r\n'):
+                if line.lower().startswith(b'content-length:'):
+                    length = int(line.split(b':', 1)[1])
+            await reader.readexactly(length)
+            samples.append(time.perf_counter() - start)
+            if not headers.startswith(b'HTTP/1.1 200'):
+                errors += 1
+    finally:
+        writer.close()
+    return errors
+
+
+async def bench_load(quick):
+    """Benchmark concurrent probes against a local Sanic server."""
+    results = []
+    duration = 2 if quick else 5
+    for count in (1, 10, 100):
+        port = free_port()
+        proc = subprocess.Popen(
+            [sys.executable, __file__, '--serve', str(port), '--checks', str(count)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_for_port(port)
+            for concurrency in (1, 16, 64):
+                samples = []
+                start = time.perf_counter()
+                errors = await asyncio.gather(*(client(port, duration, samples) for _ in range(concurrency)))
+                elapsed = time.perf_counter() - start
+
+                stats = summarize(samples)
+                stats['rps'] = len(samples) / elapsed
+                results.append(dict(checks=count, concurrency=concurrency, errors=sum(errors), **stats))
+                print(f'  load: {count} checks, {concurrency} clients', file=sys.stderr)
+        finally:
+            proc.terminate()
+            proc.wait()
+    return results
+
+
+async def main(args):
+    results = {
+        'version': sanic_healthcheck.__version__,
+        'sanic_version': sanic.__version__,
+        'python_version': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.time(),
+        'checkers': await bench_checkers(args.quick),
+        'handlers': await bench_handlers(args.quick),
+    }
+    if not args.skip_load:
+        results['load'] = await bench_load(args.quick)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--output', default='bench-results.json', help='file to write the results to')
+    parser.add_argument('--quick', action='store_true', help='run fewer iterations')
+    parser.add_argument('--skip-load', action='store_true', help='skip the local server load scenario')
+    parser.add_argument('--serve', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--checks', type=int, default=1, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.checks)
+        sys.exit(0)
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    output = loop.run_until_complete(main(args))
+
+    with open(args.output, 'w') as f:
+        json.dump(output, f, indent=2)
+    print(f'Results written to {args.output}', file=sys.stderr)
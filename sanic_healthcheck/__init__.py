@@ -11,13 +11,24 @@ __license__ = 'MIT'
 
 import logging
 
+from .check import Check, CheckContext
 from .health import HealthCheck
+from .lag import LoopLagCheck
+from .metrics import Metrics
 from .ready import ReadyCheck
+from .startup import StartupCheck
+from .traffic import TrafficCheck
 
 logging.getLogger(__name__).addHandler(logging.NullHandler())
 
 
 __all__ = [
+    'Check',
+    'CheckContext',
     'HealthCheck',
+    'LoopLagCheck',
+    'Metrics',
     'ReadyCheck',
+    'StartupCheck',
+    'TrafficCheck',
 ]
@@ -0,0 +1,76 @@
+"""A circuit breaker for checks of failing dependencies.
+
+When a dependency is down, re-running its check every time the cached failure
+expires adds load to a dependency which is already struggling; across many
+application instances this becomes a retry storm. A circuit breaker stops
+running the check after a number of consecutive failures (the breaker "opens"),
+and only tries it again (the breaker is "half open") after a backoff period,
+which grows exponentially with each failed attempt.
+"""
+
+import random
+import time
+
+BREAKER_CLOSED = 'closed'
+BREAKER_OPEN = 'open'
+BREAKER_HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """A circuit breaker tracking the consecutive failures of a single check.
+
+    Args:
+        threshold: The number of consecutive failures after which the breaker opens.
+        backoff: The time (in seconds) to wait before trying the check again after
+            the breaker first opens. This doubles each time a trial fails.
+        max_backoff: The maximum time (in seconds) to wait before trying the check again.
+        jitter: The fraction by which the backoff is randomly varied (e.g. 0.1 for
+            +/-10%), so that many instances do not retry the check in lockstep.
+    """
+
+    __slots__ = ('threshold', 'backoff', 'max_backoff', 'jitter', 'state', 'failures', 'opens', 'retry_at')
+
+    def __init__(
+            self,
+            threshold: int = 3,
+            backoff: float = 5,
+            max_backoff: float = 300,
+            jitter: float = 0.1,
+    ) -> None:
+
+        self.threshold = threshold
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+
+        self.state = BREAKER_CLOSED
+        self.failures = 0
+        self.opens = 0
+        self.retry_at = 0.0
+
+    def trial(self) -> None:
+        """Mark that the check is being tried again while the breaker is open."""
+        if self.state == BREAKER_OPEN:
+            self.state = BREAKER_HALF_OPEN
+
+    def record(self, passed: bool) -> None:
+        """Record the outcome of running the check.
+
+        Args:
+            passed: Whether the check passed.
+        """
+        if passed:
+            self.state = BREAKER_CLOSED
+            self.failures = 0
+            self.opens = 0
+            return
+
+        self.failures += 1
+        if self.state == BREAKER_HALF_OPEN or self.failures >= self.threshold:
+            self.opens += 1
+            # The exponent is capped, since a float backoff times a large
+            # power of two overflows.
+            delay = min(self.max_backoff, self.backoff * 2 ** min(self.opens - 1, 63))
+            delay *= 1 + random.uniform(-self.jitter, self.jitter)
+            self.state = BREAKER_OPEN
+            self.retry_at = time.time() + delay
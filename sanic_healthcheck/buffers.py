@@ -0,0 +1,72 @@
+"""Fixed-size buffers for recording samples in constant memory.
+
+Passive checks record a sample for every event they observe (e.g. every
+request served by the application). A ``RingBuffer`` holds the most recent
+samples in a preallocated array, overwriting the oldest sample once it is
+full, so recording a sample takes constant time and memory.
+"""
+
+import math
+from array import array
+from typing import List, Sequence
+
+
+class RingBuffer:
+    """A fixed-size buffer holding the most recently appended numbers.
+
+    Args:
+        size: The maximum number of values held by the buffer.
+        typecode: The ``array`` typecode of the values held by the buffer.
+    """
+
+    __slots__ = ('size', '_values', '_index', '_count')
+
+    def __init__(self, size: int, typecode: str = 'd') -> None:
+        if size < 1:
+            raise ValueError(f'Ring buffer size must be at least 1, got {size}')
+
+        self.size = size
+        self._values = array(typecode, [0]) * size
+        self._index = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, value) -> None:
+        """Append a value to the buffer, overwriting the oldest value if the
+        buffer is full.
+
+        Args:
+            value: The value to append.
+        """
+        self._values[self._index] = value
+        self._index = (self._index + 1) % self.size
+        if self._count < self.size:
+            self._count += 1
+
+    def values(self) -> List:
+        """Get the values held by the buffer, from oldest to newest."""
+        if self._count < self.size:
+            return self._values[:self._count].tolist()
+        return self._values[self._index:].tolist() + self._values[:self._index].tolist()
+
+    def clear(self) -> None:
+        """Remove all values from the buffer."""
+        self._index = 0
+        self._count = 0
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Get a percentile of a collection of values, using the nearest-rank method.
+
+    Args:
+        values: The values to get the percentile of. This must not be empty.
+        q: The percentile to get, between 0 and 100.
+
+    Returns:
+        The smallest value which is greater than or equal to ``q`` percent of the values.
+    """
+    ordered = sorted(values)
+    rank = math.ceil(q / 100 * len(ordered))
+    return ordered[max(rank - 1, 0)]
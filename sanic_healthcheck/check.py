@@ -0,0 +1,116 @@
+"""Check specifications for registering checks with a checker.
+
+A check function may be registered with a checker as-is, in which case the
+checker's defaults are used for it. To configure a check individually, it
+can be wrapped in a ``Check``, which holds the check function along with
+its per-check options.
+
+Check functions take no arguments by default. A check registered with
+``context=True`` is instead called with a ``CheckContext``, which gives it
+access to the application (e.g. to borrow a connection from a pool the
+application holds, rather than opening a new connection on every run).
+"""
+
+from typing import Any, Callable, Iterable, Optional
+
+
+class Check:
+    """A check registered with a checker, along with its options.
+
+    A check wraps a check function: a function which takes no arguments and
+    returns (``bool``, ``str``), where the boolean signifies whether the check
+    passed or not, and the string is a message associated with the
+    success/failure. Calling the ``Check`` calls its check function.
+
+    Args:
+        fn: The check function.
+        name: The name of the check, used to identify it in check results. If not
+            specified, the name of the check function is used.
+        timeout: The time limit (in seconds) for the check. If not specified, the
+            checker's default ``timeout`` is used.
+        success_ttl: The TTL for a successful check result to live in the cache. If
+            not specified, the checker's ``success_ttl`` is used. This only applies
+            to checkers which cache results.
+        failure_ttl: The TTL for a failed check result to live in the cache. If not
+            specified, the checker's ``failure_ttl`` is used. This only applies to
+            checkers which cache results.
+        tags: Tags used to categorize the check.
+        depends_on: The names of checks which this check depends on. The check is only
+            run once the checks it depends on have passed; if any of them fail, the
+            check is skipped and reported as failed.
+        critical: Whether the check is critical. If the checker is configured to fail
+            fast, a failure of a critical check stops the checker from running any
+            other checks.
+        context: Whether to call the check function with a ``CheckContext`` argument.
+            By default, check functions are called with no arguments.
+    """
+
+    __slots__ = ('fn', 'name', 'timeout', 'success_ttl', 'failure_ttl', 'tags', 'depends_on', 'critical', 'context')
+
+    def __init__(
+            self,
+            fn: Callable,
+            name: Optional[str] = None,
+            timeout: Optional[float] = None,
+            success_ttl: Optional[float] = None,
+            failure_ttl: Optional[float] = None,
+            tags: Optional[Iterable[str]] = None,
+            depends_on: Optional[Iterable[str]] = None,
+            critical: bool = False,
+            context: bool = False,
+    ) -> None:
+
+        self.fn = fn
+        self.name = name or fn.__name__
+        self.timeout = timeout
+        self.success_ttl = success_ttl
+        self.failure_ttl = failure_ttl
+        self.tags = tuple(tags or ())
+        self.depends_on = tuple(depends_on or ())
+        self.critical = critical
+        self.context = context
+
+    def __call__(self, *args):
+        return self.fn(*args)
+
+    def __repr__(self) -> str:
+        return f'<Check {self.name}>'
+
+    @property
+    def __name__(self) -> str:
+        return self.name
+
+
+class CheckContext:
+    """The context passed to checks registered with ``context=True``.
+
+    Args:
+        app: The Sanic application the checker is initialized with, if any.
+        ctx: The application's context object (``app.ctx``), if any.
+        checker: The checker running the check.
+    """
+
+    __slots__ = ('app', 'ctx', 'checker')
+
+    def __init__(self, app: Any, ctx: Any, checker: Any) -> None:
+        self.app = app
+        self.ctx = ctx
+        self.checker = checker
+
+    def __repr__(self) -> str:
+        return f'<CheckContext {self.checker.__class__.__name__}>'
+
+
+def as_check(check: Callable) -> Check:
+    """Get a ``Check`` for a check function.
+
+    Args:
+        check: A check function or a ``Check``.
+
+    Returns:
+        The given ``Check``, or a new ``Check`` with default options
+        wrapping the given check function.
+    """
+    if isinstance(check, Check):
+        return check
+    return Check(check)
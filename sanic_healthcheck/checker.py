@@ -5,15 +5,29 @@ import asyncio
 import logging
 import sys
 import time
-from typing import Callable, Dict, Iterator, Mapping, Optional
+import weakref
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import (Callable, Dict, Iterable, Iterator, List, Mapping,
+                    Optional, Tuple)
 
 from sanic import Sanic, response
+from sanic.exceptions import NotFound
+
+from .check import Check, CheckContext, as_check
+from .metrics import Metrics
 
 log = logging.getLogger(__name__)
 
 
 MSG_OK = 'OK'
 MSG_FAIL = 'FAILED'
+MSG_TIMEOUT = 'Timed out after {:.3g}s'
+MSG_DEADLINE = 'Timed out: probe deadline exceeded'
+MSG_SKIPPED = 'Skipped: upstream check "{}" failed'
+MSG_CANCELLED = 'Cancelled: critical check "{}" failed'
+
+CONTENT_TYPE_TEXT = 'text/plain; charset=utf-8'
 
 
 class BaseChecker(metaclass=abc.ABCMeta):
@@ -32,16 +46,17 @@ class BaseChecker(metaclass=abc.ABCMeta):
         checks: A collection of checks to register with the checker on init. A check is a
             function which takes no arguments and returns (``bool``, ``str``), where the
             boolean signifies whether the check passed or not, and the string is a message
-            associated with the success/failure.
+            associated with the success/failure. Checks may also be given as ``Check``
+            instances to configure them individually.
         success_handler: A handler function which takes the check results (a list[dict])
-            and returns a message string. This is called when all checks pass.
+            and returns a message string (or bytes). This is called when all checks pass.
         success_headers: Headers to include in the checker response on success. By default, no
             additional headers are sent. This can be useful if, for example, a success
             handler is specified which returns a JSON message. The Content-Type: application/json
             header could be included here.
         success_status: The HTTP status code to use when the checker passes its checks.
         failure_handler: A handler function which takes the check results (a list[dict])
-            and returns a message string. This is called when any check fails.
+            and returns a message string (or bytes). This is called when any check fails.
         failure_headers: Headers to include in the checker response on failure. By default, no
             additional headers are sent. This can be useful if, for example, a failure
             handler is specified which returns a JSON message. The Content-Type: application/json
@@ -53,6 +68,33 @@ class BaseChecker(metaclass=abc.ABCMeta):
             return a tuple of (bool, string), where the boolean is whether or not it passed
             and the string is the message to use for the check response. By default, no
             exception handler is registered, so an exception will lead to a check failure.
+        concurrent: Run all checks concurrently instead of one after another. Results
+            are still reported in the order the checks were registered.
+        max_concurrency: The maximum number of checks to run at once when ``concurrent``
+            is enabled. By default, there is no limit.
+        timeout: The default time limit (in seconds) for a single check. A check which runs
+            past its limit is cancelled and reported as a failure. This may be overridden
+            per check. By default, checks have no time limit.
+        deadline: The overall time budget (in seconds) for running all of the checks for
+            a single request. Checks which are still running (or have not yet started)
+            when the deadline passes are reported as timed out.
+        fail_fast: Stop running checks as soon as a critical check fails. Checks which are
+            still running are cancelled, and checks which have not yet started are not run;
+            they are reported as failed, with ``cancelled`` set in their results.
+        use_executor: Run synchronous (non-coroutine) checks in a thread pool owned by the
+            checker, rather than directly on the event loop. This keeps checks which use
+            blocking I/O from stalling other requests.
+        max_workers: The maximum number of threads in the checker's thread pool, when
+            ``use_executor`` is enabled. By default, the ``ThreadPoolExecutor`` default is used.
+        metrics: A ``Metrics`` exporter to record check latency and outcomes with.
+        etag: Send an ``ETag`` header with each response, fingerprinting the name, state
+            and message of each check result. A request with an ``If-None-Match`` header
+            matching the current fingerprint gets a ``304 Not Modified`` response with no
+            body, without the success/failure handler being called.
+        status_uri: A route URI to expose a status-only variant of the checker on. Requests
+            to it (like ``HEAD`` requests to the checker's route) get a response with the
+            checker's status code and an empty body, without the check results being
+            rendered. By default, no status-only route is exposed.
         options: Any additional options to pass to the ``Sanic.add_route`` method
             on ``init``.
     """
@@ -71,11 +113,25 @@ class BaseChecker(metaclass=abc.ABCMeta):
             failure_headers: Optional[Mapping] = None,
             failure_status: Optional[int] = 500,
             exception_handler: Optional[Callable] = None,
+            concurrent: bool = False,
+            max_concurrency: Optional[int] = None,
+            timeout: Optional[float] = None,
+            deadline: Optional[float] = None,
+            fail_fast: bool = False,
+            use_executor: bool = False,
+            max_workers: Optional[int] = None,
+            metrics: Optional[Metrics] = None,
+            etag: bool = False,
+            status_uri: Optional[str] = None,
             **options,
     ) -> None:
 
-        self.app = app
+        # The application is set when the checker is initialized with it.
+        self.app = None
         self.uri = uri
+        self.status_uri = status_uri
+        # The route URIs registered with the application, once initialized.
+        self.routes = []
 
         self.success_handler = success_handler
         self.success_headers = success_headers
@@ -87,28 +143,165 @@ class BaseChecker(metaclass=abc.ABCMeta):
 
         self.exception_handler = exception_handler
 
-        self.checks = checks or []
+        self.concurrent = concurrent
+        self.max_concurrency = max_concurrency
+
+        self.timeout = timeout
+        self.deadline = deadline
+        self.fail_fast = fail_fast
+
+        self.use_executor = use_executor
+        self.max_workers = max_workers
+        self.executor = None
+
+        self.metrics = metrics
+
+        self.etag = etag
+
+        # The Check wrapping each plain check function the checker has seen, so
+        # that a function is always run (and its result cached) as the same Check.
+        self._wrappers = weakref.WeakKeyDictionary()
+
+        self.checks = []
+        self.checks_by_name = {}
+        self.checks_by_tag = {}
+        for c in checks or []:
+            self.add_check(c)
         self.options = options
 
-        if self.app:
-            self.init(self.app, self.uri)
+        self._response_cache = None
+        self._context = None
+
+        if app:
+            self.init(app, self.uri)
 
     def init(self, app: Sanic, uri: Optional[str] = None) -> None:
         """Initialize the checker with the Sanic application.
 
         This method will register a new endpoint for the specified
-        Sanic application which exposes the results of the checker.
+        Sanic application which exposes the results of the checker (along
+        with the status-only endpoint, if configured). Unless the route
+        ``methods`` are given in the checker's options, the endpoints accept
+        ``GET`` and ``HEAD`` requests. If the
+        checker runs synchronous checks in a thread pool, server listeners are
+        also registered to manage the lifecycle of the pool. Checks which need
+        to hook into the application are initialized with it as well.
 
         Args:
             app: The Sanic application to register a new endpoint with.
             uri: The URI of the endpoint to register. If not specified, the
                 checker's ``default_uri`` is used.
+
+        Raises:
+            ValueError: A check depends on a check which is not registered, or
+                the dependencies between checks form a cycle.
         """
         if not uri:
             uri = self.default_uri
-        app.add_route(self.run, uri, **self.options)
+        self.validate_checks()
+        self.app = app
+        self._context = None
+
+        options = dict(self.options)
+        options.setdefault('methods', ['GET', 'HEAD'])
+        app.add_route(self.run, uri, **options)
+        self.routes = [uri]
+        if self.status_uri:
+            app.add_route(self.run_status, self.status_uri, **options)
+            self.routes.append(self.status_uri)
+
+        if self.use_executor:
+            app.register_listener(self.start_executor, 'before_server_start')
+            app.register_listener(self.stop_executor, 'after_server_stop')
+
+        for check in self.checks:
+            self.init_check(check, app)
+
+    def init_check(self, check: Check, app: Sanic) -> None:
+        """Initialize a check with the Sanic application, if the check needs it.
+
+        A check function which has an ``init`` method (e.g. a ``TrafficCheck``)
+        is initialized by calling ``init`` with the application, which allows it
+        to register middleware or listeners with the application. A check function
+        which has an ``exclude_checker_routes`` method is also given the checker's
+        own route URIs, so that it can ignore the checker's requests.
+
+        Args:
+            check: The check to initialize.
+            app: The Sanic application the checker is initialized with.
+        """
+        init = getattr(check.fn, 'init', None)
+        if callable(init):
+            init(app)
+
+        exclude = getattr(check.fn, 'exclude_checker_routes', None)
+        if callable(exclude):
+            exclude(self.routes)
+
+    async def start_executor(self, app: Sanic, loop) -> None:
+        """Create the thread pool used to run synchronous checks.
+
+        This is registered as a ``before_server_start`` listener on ``init``.
+        """
+        self.get_executor()
+
+    async def stop_executor(self, app: Sanic, loop) -> None:
+        """Shut down the thread pool used to run synchronous checks.
 
-    def add_check(self, fn: Callable) -> None:
+        This is registered as an ``after_server_stop`` listener on ``init``.
+        The pool is shut down without waiting for running checks to complete,
+        so a hung check does not block server shutdown.
+        """
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+    def get_executor(self) -> ThreadPoolExecutor:
+        """Get the thread pool used to run synchronous checks, creating it
+        if it does not yet exist.
+        """
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix=self.__class__.__name__,
+            )
+        return self.executor
+
+    def get_context(self) -> CheckContext:
+        """Get the context passed to checks registered with ``context=True``,
+        creating it if it does not yet exist.
+        """
+        if self._context is None:
+            self._context = CheckContext(self.app, getattr(self.app, 'ctx', None), self)
+        return self._context
+
+    def get_check(self, check: Callable) -> Check:
+        """Get the ``Check`` for a check function.
+
+        Checks are normally registered with ``add_check``, which wraps plain
+        check functions in a ``Check``. Plain check functions which reach the
+        checker by other means (e.g. appended to ``checks`` directly) are wrapped
+        once, and the same ``Check`` is used for them from then on, so that their
+        results are cached (by checkers which cache results) across runs.
+
+        Args:
+            check: A check function or a ``Check``.
+
+        Returns:
+            The given ``Check``, or the ``Check`` wrapping the given check function.
+        """
+        if isinstance(check, Check):
+            return check
+        try:
+            wrapper = self._wrappers.get(check)
+        except TypeError:
+            # The function can not be weakly referenced, so it can not be tracked.
+            return as_check(check)
+        if wrapper is None:
+            wrapper = self._wrappers[check] = as_check(check)
+        return wrapper
+
+    def add_check(self, fn: Callable, **kwargs) -> Check:
         """Add a check to the checker.
 
         A check function is a function which takes no arguments and returns
@@ -116,52 +309,649 @@ class BaseChecker(metaclass=abc.ABCMeta):
         passed or not, and the string is a message associated with the
         success/failure.
 
+        If the checker has already been initialized with the application, the
+        check is initialized with it as well (see ``init_check``), and the
+        dependencies between the checks are validated, so the checks a check
+        depends on must be added before it.
+
+        Args:
+            fn: The check to add. This may be a check function or a ``Check``.
+            kwargs: Options for the check (e.g. ``name``, ``timeout``, ``tags``).
+                See ``Check`` for the supported options. These may not be given
+                if ``fn`` is already a ``Check``.
+
+        Returns:
+            The ``Check`` which was added to the checker.
+
+        Raises:
+            ValueError: The checker has been initialized with the application, and
+                the check depends on an unknown check or on itself (via a cycle).
+        """
+        if kwargs:
+            check = Check(fn, **kwargs)
+        else:
+            check = as_check(fn)
+
+        self.checks.append(check)
+        self.checks_by_name.setdefault(check.name, []).append(check)
+        for tag in check.tags:
+            self.checks_by_tag.setdefault(tag, []).append(check)
+
+        if self.app is not None:
+            try:
+                self.validate_checks()
+            except ValueError:
+                self._remove_check(check)
+                raise
+            self.init_check(check, self.app)
+        return check
+
+    def _remove_check(self, check: Check) -> None:
+        """Remove a check which failed validation from the checker's registry."""
+        self.checks.remove(check)
+        self.checks_by_name[check.name].remove(check)
+        if not self.checks_by_name[check.name]:
+            del self.checks_by_name[check.name]
+        for tag in check.tags:
+            self.checks_by_tag[tag].remove(check)
+            if not self.checks_by_tag[tag]:
+                del self.checks_by_tag[tag]
+
+    def validate_checks(self) -> None:
+        """Validate the dependencies between the checks registered with the checker.
+
+        This is called on ``init``, so that a misconfigured dependency fails on
+        startup rather than on every request to the checker.
+
+        Raises:
+            ValueError: A check depends on a check which is not registered, or
+                the dependencies between checks form a cycle.
+        """
+        checks = [self.get_check(c) for c in self.checks]
+        if any(c.depends_on for c in checks):
+            self._topological_order(checks)
+
+    def check(self, fn: Optional[Callable] = None, **kwargs) -> Callable:
+        """A decorator which adds the decorated function as a check.
+
+        The decorator may be used bare, or called with options for the check.
+        The decorated function is returned unchanged.
+
+        .. code-block:: python
+
+          @health_check.check
+          def check_cache():
+              ...
+
+          @health_check.check(name='db', timeout=2, tags=['critical'])
+          async def check_db_connection():
+              ...
+
         Args:
-            fn: The check to add.
+            fn: The check function to add.
+            kwargs: Options for the check. See ``Check`` for the supported options.
         """
-        self.checks.append(fn)
+        if fn is not None:
+            self.add_check(fn, **kwargs)
+            return fn
+
+        def decorator(f: Callable) -> Callable:
+            self.add_check(f, **kwargs)
+            return f
+
+        return decorator
 
     @abc.abstractmethod
-    async def run(self, request) -> response.HTTPResponse:
+    async def run(self, request, status_only: bool = False) -> response.HTTPResponse:
         """Run the checker.
 
         Each subclass of the BaseChecker must define its own ``run`` logic.
+        A status-only run (or a run for a ``HEAD`` request; see ``is_status_only``)
+        should respond with ``make_status_response``, without rendering the
+        check results.
         """
         raise NotImplementedError
 
-    async def exec_check(self, check: Callable) -> Dict:
+    async def run_status(self, request) -> response.HTTPResponse:
+        """Run the checker, responding with its status code and an empty body.
+
+        This is the handler for the checker's ``status_uri`` route.
+        """
+        return await self.run(request, status_only=True)
+
+    @staticmethod
+    def is_status_only(request, status_only: bool = False) -> bool:
+        """Check whether a response should be status-only: either because it
+        was requested, or because the request is a ``HEAD`` request.
+        """
+        return status_only or getattr(request, 'method', None) == 'HEAD'
+
+    def select_checks(self, request) -> List[Check]:
+        """Select the checks to run for a request.
+
+        By default, all checks are run. A request may select a subset of the
+        checks by name with the ``check`` query parameter, and/or by tag with the
+        ``tag`` query parameter (e.g. ``/health?check=db`` or ``/ready?tag=critical``).
+        Each parameter may be given multiple times, or as a comma-separated list.
+        Checks which the selected checks depend on are also selected.
+
+        Args:
+            request: The request to select checks for.
+
+        Returns:
+            The selected checks.
+
+        Raises:
+            NotFound: A requested check name or tag does not match any checks.
+        """
+        selection = self.get_selection(request)
+        if selection is None:
+            return self.checks
+        return self.find_checks(*selection)
+
+    @staticmethod
+    def get_selection(request) -> Optional[Tuple[List[str], List[str]]]:
+        """Get the check names and tags selected by a request's query parameters.
+
+        Args:
+            request: The request to get the selection for.
+
+        Returns:
+            The selected check names and tags, or None if the request does not
+            select any checks (i.e. all checks should be run).
+        """
+        if request is None or not request.args:
+            return None
+
+        names = _split_args(request.args.getlist('check'))
+        tags = _split_args(request.args.getlist('tag'))
+        if not names and not tags:
+            return None
+        return names, tags
+
+    def find_checks(self, names: Iterable[str], tags: Iterable[str]) -> List[Check]:
+        """Find the registered checks with the given names and tags, along with
+        the checks which they depend on.
+
+        Args:
+            names: The names of the checks to find.
+            tags: The tags of the checks to find.
+
+        Returns:
+            The matching checks.
+
+        Raises:
+            NotFound: A check name or tag does not match any checks.
+        """
+        selected = {}
+        for index, key in ((self.checks_by_name, names), (self.checks_by_tag, tags)):
+            for value in key:
+                matches = index.get(value)
+                if not matches:
+                    raise NotFound(f'No checks match "{value}"')
+                for check in matches:
+                    selected[check] = None
+
+        return self.with_dependencies(selected)
+
+    def with_dependencies(self, checks: Iterable[Check]) -> List[Check]:
+        """Get a collection of checks along with the registered checks which they
+        (directly or indirectly) depend on.
+
+        Args:
+            checks: The checks to get the dependencies of.
+
+        Returns:
+            The given checks, followed by the checks they depend on.
+        """
+        selected = dict.fromkeys(checks)
+        pending = [c for c in selected if c.depends_on]
+        while pending:
+            check = pending.pop()
+            for name in check.depends_on:
+                for dependency in self.checks_by_name.get(name, ()):
+                    if dependency not in selected:
+                        selected[dependency] = None
+                        pending.append(dependency)
+
+        return list(selected)
+
+    def make_response(self, results: List[Dict], key=None, request=None) -> response.HTTPResponse:
+        """Generate an HTTP response for the results of the checker's checks.
+
+        If all checks passed, the response is built from the checker's success
+        handler, headers and status; otherwise, it is built from the failure
+        handler, headers and status.
+
+        If a key is given, the rendered response body is cached under that key,
+        and a subsequent call with the same key reuses it without calling the
+        success/failure handler again. Checkers should only pass a key which
+        changes whenever the results change.
+
+        If the checker sends ETags and the request's ``If-None-Match`` header
+        matches the fingerprint of the results, a ``304 Not Modified`` response
+        is returned instead, without rendering the response body.
+
+        Args:
+            results: The results of the checks.
+            key: The key identifying the state of the results, if the response
+                should be cached.
+            request: The request being responded to, if any.
+
+        Returns:
+            The HTTP response for the checker.
+        """
+        cached = self._response_cache
+        if key is not None and cached is not None and cached[0] == key:
+            _, body, status, headers = cached
+            if self.etag and _etag_matches(request, headers['ETag']):
+                return _not_modified(headers['ETag'])
+        else:
+            tag = None
+            if self.etag:
+                tag = make_etag(results)
+                if _etag_matches(request, tag):
+                    return _not_modified(tag)
+
+            if all((r['passed'] for r in results)):
+                body = MSG_OK
+                if self.success_handler:
+                    body = self.success_handler(results)
+                status = self.success_status
+                headers = self.success_headers
+            else:
+                body = MSG_FAIL
+                if self.failure_handler:
+                    body = self.failure_handler(results)
+                status = self.failure_status
+                headers = self.failure_headers
+
+            if isinstance(body, str):
+                body = body.encode()
+            if tag is not None:
+                headers = dict(headers or {}, ETag=tag)
+            if key is not None:
+                self._response_cache = (key, body, status, headers)
+
+        return response.HTTPResponse(
+            body=body,
+            status=status,
+            headers=headers,
+            content_type=CONTENT_TYPE_TEXT,
+        )
+
+    def make_status_response(self, results: Iterable[Dict]) -> response.HTTPResponse:
+        """Generate a status-only HTTP response for the results of the checker's
+        checks: the checker's success or failure status and headers, with an
+        empty body. The success/failure handler is not called.
+
+        Args:
+            results: The results of the checks.
+
+        Returns:
+            The HTTP response for the checker.
+        """
+        if all((r['passed'] for r in results)):
+            return response.HTTPResponse(status=self.success_status, headers=self.success_headers)
+        return response.HTTPResponse(status=self.failure_status, headers=self.failure_headers)
+
+    async def run_checks(self, checks: Iterable[Callable], runner: Optional[Callable] = None) -> List[Dict]:
+        """Run a collection of checks and gather their results.
+
+        If the checker is configured to run concurrently, all checks are started
+        at once (bounded by ``max_concurrency``); otherwise they are run one after
+        another. In either case, the results are returned in the same order as
+        the given checks.
+
+        Checks which depend on other checks are only run once the checks they
+        depend on have completed. If any of those failed, the check is not run
+        and a skipped result is reported for it instead.
+
+        If the checker is configured to fail fast, the first failure of a
+        critical check stops the run: checks which are still running are
+        cancelled, checks which have not started are not run, and a cancelled
+        result is reported for each of them.
+
+        Args:
+            checks: The checks to run.
+            runner: A coroutine function which takes a check and the probe deadline
+                and returns the check's result dictionary. If not specified,
+                ``exec_check`` is used.
+
+        Returns:
+            A list of the check results.
+        """
+        if runner is None:
+            runner = self.exec_check
+
+        checks = [self.get_check(c) for c in checks]
+
+        deadline = None
+        if self.deadline is not None:
+            deadline = asyncio.get_event_loop().time() + self.deadline
+
+        by_name = None
+        order = checks
+        if any(c.depends_on for c in checks):
+            by_name = {c.name: c for c in checks}
+            order = self._topological_order(checks)
+
+        if not self.concurrent:
+            results = {}
+            critical_failure = None
+            for check in order:
+                if critical_failure is not None:
+                    results[check] = self.cancel_check(check, critical_failure)
+                    continue
+
+                upstream = None
+                for name in check.depends_on:
+                    if not results[by_name[name]]['passed']:
+                        upstream = name
+                        break
+
+                if upstream is not None:
+                    results[check] = self.skip_check(check, upstream)
+                else:
+                    results[check] = await runner(check, deadline)
+
+                if self.fail_fast and check.critical and not results[check]['passed']:
+                    critical_failure = check.name
+
+            return [results[c] for c in checks]
+
+        semaphore = asyncio.Semaphore(self.max_concurrency) if self.max_concurrency else None
+        futures = {}
+
+        async def run(check):
+            for name in check.depends_on:
+                result = await asyncio.shield(futures[by_name[name]])
+                if not result['passed']:
+                    return self.skip_check(check, name)
+            if semaphore is None:
+                return await runner(check, deadline)
+            async with semaphore:
+                return await runner(check, deadline)
+
+        for check in order:
+            if check not in futures:
+                futures[check] = asyncio.ensure_future(run(check))
+
+        critical_failure = None
+        pending = set(futures.values())
+        try:
+            if self.fail_fast:
+                critical = {futures[c]: c for c in futures if c.critical}
+                while pending and critical_failure is None:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for future in done:
+                        if future in critical and not future.result()['passed']:
+                            critical_failure = critical[future].name
+                            break
+            else:
+                await asyncio.gather(*pending)
+                pending = set()
+        finally:
+            for future in pending:
+                future.cancel()
+
+        if pending:
+            await asyncio.wait(pending)
+
+        results = []
+        for check in checks:
+            future = futures[check]
+            if future.cancelled():
+                results.append(self.cancel_check(check, critical_failure))
+            else:
+                results.append(future.result())
+        return results
+
+    @staticmethod
+    def _topological_order(checks: List[Check]) -> List[Check]:
+        """Order checks so that each check comes after the checks it depends on.
+
+        Raises:
+            ValueError: A check depends on a check which is not registered, or
+                the dependencies between checks form a cycle.
+        """
+        by_name = {c.name: c for c in checks}
+        for check in checks:
+            for name in check.depends_on:
+                if name not in by_name:
+                    raise ValueError(f'Check "{check.name}" depends on unknown check "{name}"')
+
+        order = []
+        state = {}
+
+        def visit(check):
+            if state.get(check) == 'done':
+                return
+            if state.get(check) == 'visiting':
+                raise ValueError(f'Dependency cycle detected at check "{check.name}"')
+            state[check] = 'visiting'
+            for name in check.depends_on:
+                visit(by_name[name])
+            state[check] = 'done'
+            order.append(check)
+
+        for check in checks:
+            visit(check)
+        return order
+
+    def cancel_check(self, check: Check, critical: str) -> Dict:
+        """Generate the result for a check which was cancelled (or never run)
+        because a critical check failed while the checker was failing fast.
+
+        Args:
+            check: The check which was cancelled.
+            critical: The name of the critical check which failed.
+
+        Returns:
+            A dictionary containing the (failed) result of the check, marked
+            as ``cancelled``.
+        """
+        result = self._make_result(check.name, False, MSG_CANCELLED.format(critical), 0.0)
+        result['cancelled'] = True
+        return result
+
+    def skip_check(self, check: Check, upstream: str) -> Dict:
+        """Generate the result for a check which was skipped because a check
+        it depends on failed.
+
+        Args:
+            check: The check which was skipped.
+            upstream: The name of the check it depends on which failed.
+
+        Returns:
+            A dictionary containing the (failed) result of the check, marked
+            as ``skipped``.
+        """
+        log.error(
+            f'{self.__class__.__name__} check "{check.name}" skipped: upstream check "{upstream}" failed')
+
+        result = self._make_result(check.name, False, MSG_SKIPPED.format(upstream), 0.0)
+        result['skipped'] = True
+        return result
+
+    def get_timeout(self, check: Check, deadline: Optional[float] = None) -> Optional[float]:
+        """Get the time limit for running a check.
+
+        Args:
+            check: The check to get the time limit for.
+            deadline: The event loop time by which the probe must complete, if any.
+
+        Returns:
+            The number of seconds the check may run for, or None if it has no limit.
+        """
+        timeout = self.timeout if check.timeout is None else check.timeout
+        if deadline is not None:
+            remaining = deadline - asyncio.get_event_loop().time()
+            if timeout is None or remaining < timeout:
+                timeout = remaining
+        return timeout
+
+    def timeout_message(self, check: Check, timeout: float) -> str:
+        """Get the message for a check which ran past its time limit.
+
+        Args:
+            check: The check which timed out.
+            timeout: The time limit the check ran past (see ``get_timeout``).
+
+        Returns:
+            The message for the check's own time limit, or, if the limit was cut
+            short by the probe deadline, the message for the probe deadline.
+        """
+        if timeout == (self.timeout if check.timeout is None else check.timeout):
+            return MSG_TIMEOUT.format(timeout)
+        return MSG_DEADLINE
+
+    async def exec_check(self, check: Callable, deadline: Optional[float] = None) -> Dict:
         """Execute a single check and generate a dictionary result from the
         result of the check.
 
+        Synchronous checks are run in the checker's thread pool if ``use_executor``
+        is enabled; otherwise, they are called directly on the event loop. Checks
+        registered with ``context=True`` are called with the checker's context
+        (see ``get_context``); other checks are called with no arguments.
+
+        Checks which run past their time limit are cancelled and reported as
+        having timed out. Synchronous checks called on the event loop can not be
+        interrupted, so time limits do not apply to them once started; however,
+        they are not started at all if the probe deadline has already passed.
+        A check running in the thread pool which times out is abandoned, but
+        its thread runs until the check returns.
+
         Args:
-            check: The check function to execute.
+            check: The check to execute. This may be a check function or a ``Check``.
+            deadline: The event loop time by which the probe must complete, if any.
 
         Returns:
-            A dictionary containing the results of the check.
+            A dictionary containing the results of the check. In addition to the
+            check name, message, pass/fail state and timestamp, the result records
+            the check's execution time (``duration``, from a monotonic clock) and
+            its cache provenance: whether the result was served from a cache
+            (``cached``), how old it is (``age``) and when it expires (``expires``).
+            Checkers which cache results update these fields as they serve them.
         """
+        check = self.get_check(check)
+        fn = check.fn
+        args = (self.get_context(),) if check.context else ()
+        timeout = self.get_timeout(check, deadline)
+        timed_out = False
+        start = time.perf_counter()
         try:
-            if asyncio.iscoroutinefunction(check):
-                passed, msg = await check()
+            if timeout is not None and timeout <= 0:
+                timed_out = True
+                raise asyncio.TimeoutError
+
+            future = None
+            if asyncio.iscoroutinefunction(fn):
+                future = fn(*args) if timeout is None else asyncio.ensure_future(fn(*args))
+            elif self.use_executor:
+                future = asyncio.get_event_loop().run_in_executor(self.get_executor(), fn, *args)
             else:
-                passed, msg = check()
-        except Exception:
-            log.exception(
-                f'Exception while running {self.__class__.__name__} check')
+                passed, msg = fn(*args)
 
+            if future is not None:
+                try:
+                    passed, msg = await asyncio.wait_for(future, timeout)
+                except asyncio.TimeoutError:
+                    # A check may raise a TimeoutError of its own (e.g. a socket
+                    # timeout); it only ran past its time limit if it was cancelled.
+                    timed_out = timeout is not None and future.cancelled()
+                    raise
+        except Exception:
             info = sys.exc_info()
+            if timed_out:
+                log.error(
+                    f'{self.__class__.__name__} check "{check.name}" timed out')
+            else:
+                log.exception(
+                    f'Exception while running {self.__class__.__name__} check')
+
             if self.exception_handler:
-                passed, msg = self.exception_handler(check, info)
+                passed, msg = self.exception_handler(fn, info)
+            elif timed_out:
+                passed = False
+                msg = self.timeout_message(check, timeout)
             else:
                 passed = False
                 msg = f'Exception raised: {info[0].__name__}: {info[1]}'
 
+        duration = time.perf_counter() - start
+
         if not passed:
             log.error(
-                f'{self.__class__.__name__} check "{check.__name__}" failed: {msg}')
+                f'{self.__class__.__name__} check "{check.name}" failed: {msg}')
 
+        if self.metrics is not None:
+            self.metrics.observe(self.__class__.__name__, check.name, duration, passed, timed_out)
+
+        return self._make_result(check.name, passed, msg, duration)
+
+    @staticmethod
+    def _make_result(name: str, passed: bool, msg: str, duration: float) -> Dict:
+        """Generate the dictionary result for a check."""
         return {
-            'check': check.__name__,
+            'check': name,
             'message': msg,
             'passed': passed,
             'timestamp': time.time(),
+            'duration': duration,
+            'cached': False,
+            'age': 0.0,
+            'expires': None,
         }
+
+
+def make_etag(results: Iterable[Dict]) -> str:
+    """Generate an ETag fingerprinting the state of check results.
+
+    The fingerprint covers the name, pass/fail state and message of each
+    result, but not its timing or cache details. Since a response body may
+    include those, the ETag is a weak validator.
+
+    Args:
+        results: The check results to fingerprint.
+
+    Returns:
+        The (weak) ETag for the results.
+    """
+    crc = 0
+    for r in results:
+        crc = zlib.crc32(f'{r["check"]}\0{r["passed"]:d}\0{r["message"]}\0'.encode(), crc)
+    return f'W/"{crc:08x}"'
+
+
+def _etag_matches(request, tag: str) -> bool:
+    """Check whether a request's ``If-None-Match`` header matches an ETag."""
+    headers = getattr(request, 'headers', None)
+    if not headers:
+        return False
+    value = headers.get('If-None-Match')
+    if not value:
+        return False
+    if value.strip() == '*':
+        return True
+    # ETags are compared with the weak comparison function, as required for
+    # If-None-Match, so the weak indicator is ignored.
+    for t in value.split(','):
+        t = t.strip()
+        if t[:2] == 'W/':
+            t = t[2:]
+        if t == tag[2:]:
+            return True
+    return False
+
+
+def _not_modified(tag: str) -> response.HTTPResponse:
+    """Generate a ``304 Not Modified`` response for an ETag."""
+    return response.HTTPResponse(status=304, headers={'ETag': tag})
+
+
+def _split_args(values: Optional[List[str]]) -> List[str]:
+    """Split a list of query parameter values, which may be comma-separated."""
+    if not values:
+        return []
+    return [v for value in values for v in value.split(',') if v]
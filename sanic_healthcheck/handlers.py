@@ -2,7 +2,17 @@
 
 import json
 import time
-from typing import Iterator, Mapping
+from typing import Any, Callable, Iterator, Mapping, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
 
 
 def json_success_handler(results: Iterator[Mapping]) -> str:
@@ -11,7 +21,8 @@ def json_success_handler(results: Iterator[Mapping]) -> str:
     Args:
         results: The results of all checks which were executed for a checker.
             Each result dictionary is guaranteed to have the keys: 'check',
-            'message', 'passed', 'timestamp'.
+            'message', 'passed', 'timestamp', 'duration', 'cached', 'age',
+            'expires'.
 
     Returns:
         The checker response, formatted as JSON.
@@ -29,7 +40,8 @@ def json_failure_handler(results: Iterator[Mapping]) -> str:
    Args:
         results: The results of all checks which were executed for a checker.
             Each result dictionary is guaranteed to have the keys: 'check',
-            'message', 'passed', 'timestamp'.
+            'message', 'passed', 'timestamp', 'duration', 'cached', 'age',
+            'expires'.
 
     Returns:
         The checker response, formatted as JSON.
@@ -39,3 +51,71 @@ def json_failure_handler(results: Iterator[Mapping]) -> str:
         'timestamp': time.time(),
         'results': results,
     })
+
+
+def get_json_encoder() -> Callable[[Any], bytes]:
+    """Get the fastest available JSON encoder.
+
+    ``orjson`` is used if it is installed, followed by ``ujson``. If neither
+    is installed, the standard library ``json`` module is used.
+
+    Returns:
+        A function which encodes an object as JSON bytes.
+    """
+    if orjson is not None:
+        return orjson.dumps
+    if ujson is not None:
+        return lambda obj: ujson.dumps(obj).encode()
+    return lambda obj: json.dumps(obj).encode()
+
+
+def make_json_success_handler(encoder: Optional[Callable[[Any], bytes]] = None) -> Callable:
+    """Create a success handler which returns results as JSON-encoded bytes.
+
+    The response is the same as that of ``json_success_handler``, but it is
+    returned as bytes, so the checker does not need to encode it again.
+
+    Args:
+        encoder: A function which encodes an object as JSON bytes. If not
+            specified, the encoder from ``get_json_encoder`` is used.
+
+    Returns:
+        The success handler.
+    """
+    if encoder is None:
+        encoder = get_json_encoder()
+
+    def handler(results: Iterator[Mapping]) -> bytes:
+        return encoder({
+            'status': 'success',
+            'timestamp': time.time(),
+            'results': results,
+        })
+
+    return handler
+
+
+def make_json_failure_handler(encoder: Optional[Callable[[Any], bytes]] = None) -> Callable:
+    """Create a failure handler which returns results as JSON-encoded bytes.
+
+    The response is the same as that of ``json_failure_handler``, but it is
+    returned as bytes, so the checker does not need to encode it again.
+
+    Args:
+        encoder: A function which encodes an object as JSON bytes. If not
+            specified, the encoder from ``get_json_encoder`` is used.
+
+    Returns:
+        The failure handler.
+    """
+    if encoder is None:
+        encoder = get_json_encoder()
+
+    def handler(results: Iterator[Mapping]) -> bytes:
+        return encoder({
+            'status': 'failure',
+            'timestamp': time.time(),
+            'results': results,
+        })
+
+    return handler
@@ -14,16 +14,39 @@ https://docs.docker.com/compose/compose-file/#healthcheck
 This checker exposes the ``/health`` endpoint by default.
 """
 
+import asyncio
 import logging
 import time
-from typing import Callable, Mapping, Optional
+from typing import Callable, Dict, Mapping, Optional
 
 from sanic import Sanic, response
 
-from .checker import MSG_FAIL, MSG_OK, BaseChecker
+from .breaker import BREAKER_OPEN, CircuitBreaker
+from .check import Check
+from .checker import BaseChecker
+from .metrics import Metrics
+from .store import SharedResultStore
 
 log = logging.getLogger(__name__)
 
+# Bounds on how long the background refresh task sleeps between cycles. The
+# upper bound ensures newly added checks are picked up promptly.
+MIN_REFRESH_INTERVAL = 0.01
+MAX_REFRESH_INTERVAL = 1
+
+# The longest time (in seconds) an expired shared result is used locally while
+# another worker holds the lease for refreshing it, before the store is checked
+# for a new result.
+LEASE_POLL_INTERVAL = 1
+
+# The interval (in seconds) at which a worker with no result for a check polls
+# the shared store while another worker holds the lease for running it.
+LEASE_WAIT_INTERVAL = 0.05
+
+# The message of a result reported as failed because, in background mode, it
+# has not been refreshed for too long.
+MSG_STALE = 'Stale: not refreshed for {:.3g}s'
+
 
 class HealthCheck(BaseChecker):
     """A checker allowing a Sanic application to describe the health of the
@@ -36,6 +59,42 @@ class HealthCheck(BaseChecker):
     time, reducing the execution cost. This may be particularly helpful if a given
     health check is more expensive.
 
+    The checker may also be run in background mode (``background=True``). In this
+    mode, a task started with the server re-runs each check whenever its cached
+    result expires, and requests to the health endpoint only read the latest
+    cached results, so the cost of running checks is never paid by a request.
+    Each check is refreshed independently, and a result which is not refreshed
+    long after it expired is reported as failed.
+
+    A stale-while-revalidate window may be configured with ``stale_ttl``. For
+    that long after a cached result expires, the expired result is still used
+    and the check is re-run in the background, so the request does not wait
+    for it. Results older than that are refreshed before responding.
+
+    If ``cache_response`` is enabled, the rendered response is also cached and
+    reused for as long as no check results have changed, so the success and
+    failure handlers are only called when the health state changes. Note
+    that this means any timestamp generated by the handler reflects when
+    the response was rendered, not when it was sent.
+
+    When running with multiple workers, a ``SharedResultStore`` may be given to
+    share cached results between all worker processes on the host, so each
+    check is run by a single worker when its result expires rather than by
+    every worker.
+
+    Circuit breakers may be enabled with ``breaker_threshold``. Once a check
+    fails that many times in a row, its breaker opens: the failed result is
+    served from the cache without running the check until a backoff period
+    (with jitter) has elapsed, after which the check is tried once more. Each
+    failed trial doubles the backoff, up to ``breaker_max_backoff``. When
+    enabled, each result includes the state of its check's breaker
+    (``breaker``: one of 'closed', 'open' or 'half_open').
+
+    Only one execution of a given check is in flight at a time. If a check is
+    already running when its result is needed (e.g. when multiple requests
+    arrive just after its cached result expires), the caller waits for the
+    result of that execution rather than running the check again.
+
     Args:
         app: The Sanic application instance to register the checker to. If not specified on
             initialization, the user must pass it to the ``init`` method to register the checker
@@ -45,31 +104,79 @@ class HealthCheck(BaseChecker):
         checks: A collection of checks to register with the checker on init. A check is a
             function which takes no arguments and returns (``bool``, ``str``), where the
             boolean signifies whether the check passed or not, and the string is a message
-            associated with the success/failure.
+            associated with the success/failure. Checks may also be given as ``Check``
+            instances to configure them individually.
         no_cache: Disable the checker from caching check results. If this is set to ``True``, the
             ``success_ttl`` and ``failure_ttl`` do nothing.
         success_handler: A handler function which takes the check results (a list[dict])
-            and returns a message string. This is called when all checks pass.
+            and returns a message string (or bytes). This is called when all checks pass.
         success_headers: Headers to include in the checker response on success. By default, no
             additional headers are sent. This can be useful if, for example, a success
             handler is specified which returns a JSON message. The Content-Type: application/json
             header could be included here.
         success_status: The HTTP status code to use when the checker passes its checks.
         success_ttl: The TTL for a successful check result to live in the cache before it is updated.
+            This may be overridden per check.
         failure_handler: A handler function which takes the check results (a list[dict])
-            and returns a message string. This is called when any check fails.
+            and returns a message string (or bytes). This is called when any check fails.
         failure_headers: Headers to include in the checker response on failure. By default, no
             additional headers are sent. This can be useful if, for example, a failure
             handler is specified which returns a JSON message. The Content-Type: application/json
             header could be included here.
         failure_status: The HTTP status code to use when the checker fails its checks.
         failure_ttl: The TTL for a failed check result to live in the cache before it is updated.
+            This may be overridden per check.
         exception_handler: A function which would get called when a registered check
             raises an exception. This handler must take two arguments: the check function
             which raised the exception, and the tuple returned by ``sys.exc_info``. It must
             return a tuple of (bool, string), where the boolean is whether or not it passed
             and the string is the message to use for the check response. By default, no
             exception handler is registered, so an exception will lead to a check failure.
+        concurrent: Run all checks concurrently instead of one after another. Results
+            are still reported in the order the checks were registered.
+        max_concurrency: The maximum number of checks to run at once when ``concurrent``
+            is enabled. By default, there is no limit.
+        timeout: The default time limit (in seconds) for a single check. A check which runs
+            past its limit is cancelled and reported as a failure. This may be overridden
+            per check. By default, checks have no time limit.
+        deadline: The overall time budget (in seconds) for running all of the checks for
+            a single request. Checks which are still running (or have not yet started)
+            when the deadline passes are reported as timed out.
+        fail_fast: Stop running checks as soon as a critical check fails. Checks which are
+            still running are cancelled, and checks which have not yet started are not run;
+            they are reported as failed, with ``cancelled`` set in their results. A check
+            execution which another request is also waiting for keeps running for it.
+        use_executor: Run synchronous (non-coroutine) checks in a thread pool owned by the
+            checker, rather than directly on the event loop. This keeps checks which use
+            blocking I/O from stalling other requests.
+        max_workers: The maximum number of threads in the checker's thread pool, when
+            ``use_executor`` is enabled. By default, the ``ThreadPoolExecutor`` default is used.
+        metrics: A ``Metrics`` exporter to record check latency and outcomes with.
+        etag: Send an ``ETag`` header with each response, fingerprinting the name, state
+            and message of each check result. A request with an ``If-None-Match`` header
+            matching the current fingerprint gets a ``304 Not Modified`` response with no
+            body, without the success/failure handler being called.
+        status_uri: A route URI to expose a status-only variant of the checker on. Requests
+            to it (like ``HEAD`` requests to the checker's route) get a response with the
+            checker's status code and an empty body, without the check results being
+            rendered. By default, no status-only route is exposed.
+        background: Refresh check results in a background task instead of when a request
+            finds an expired result in the cache. This can not be used with ``no_cache``.
+        stale_ttl: The time (in seconds) after a cached result expires during which it is
+            still served while the check is re-run in the background. By default, expired
+            results are never served. In background mode, a result which has not been
+            refreshed this long after it expired (by default, its TTL) is reported as failed.
+        cache_response: Cache the rendered response body, and reuse it until a check result
+            changes. This has no effect if ``no_cache`` is set.
+        store: A ``SharedResultStore`` used to share cached results between worker
+            processes. This has no effect if ``no_cache`` is set.
+        breaker_threshold: The number of consecutive failures of a check after which its
+            circuit breaker opens. By default, circuit breakers are disabled. This has no
+            effect if ``no_cache`` is set.
+        breaker_backoff: The time (in seconds) to wait before trying a check again after its
+            circuit breaker first opens.
+        breaker_max_backoff: The maximum time (in seconds) to wait before trying a check again
+            while its circuit breaker is open.
         options: Any additional options to pass to the ``Sanic.add_route`` method
             on ``init``.
     """
@@ -91,15 +198,54 @@ class HealthCheck(BaseChecker):
             failure_status: Optional[int] = 500,
             failure_ttl: Optional[int] = 5,
             exception_handler: Optional[Callable] = None,
+            concurrent: bool = False,
+            max_concurrency: Optional[int] = None,
+            timeout: Optional[float] = None,
+            deadline: Optional[float] = None,
+            fail_fast: bool = False,
+            use_executor: bool = False,
+            max_workers: Optional[int] = None,
+            metrics: Optional[Metrics] = None,
+            etag: bool = False,
+            status_uri: Optional[str] = None,
+            background: bool = False,
+            stale_ttl: Optional[float] = None,
+            cache_response: bool = False,
+            store: Optional[SharedResultStore] = None,
+            breaker_threshold: Optional[int] = None,
+            breaker_backoff: float = 5,
+            breaker_max_backoff: float = 300,
             **options,
     ) -> None:
 
+        if background and no_cache:
+            raise ValueError('HealthCheck background mode requires result caching')
+
         self.cache = {}
         self.no_cache = no_cache
 
         self.success_ttl = success_ttl
         self.failure_ttl = failure_ttl
 
+        self.background = background
+        self.refresh_task = None
+
+        self.stale_ttl = stale_ttl
+
+        self.cache_response = cache_response
+        self.generation = 0
+
+        self.store = store
+
+        self.breaker_threshold = breaker_threshold
+        self.breaker_backoff = breaker_backoff
+        self.breaker_max_backoff = breaker_max_backoff
+        self.breakers = {}
+
+        self._inflight = {}
+        # The number of callers waiting for each in-flight execution.
+        self._waiters = {}
+
         super(HealthCheck, self).__init__(
             app=app,
             uri=uri,
@@ -111,50 +257,407 @@ class HealthCheck(BaseChecker):
             failure_headers=failure_headers,
             failure_status=failure_status,
             exception_handler=exception_handler,
+            concurrent=concurrent,
+            max_concurrency=max_concurrency,
+            timeout=timeout,
+            deadline=deadline,
+            fail_fast=fail_fast,
+            use_executor=use_executor,
+            max_workers=max_workers,
+            metrics=metrics,
+            etag=etag,
+            status_uri=status_uri,
             **options,
         )
 
-    async def run(self, request) -> response.HTTPResponse:
-        """Run all checks and generate an HTTP response for the results."""
-
-        results = []
-        for check in self.checks:
-            # See if the check already has a cached health state. If so, use it;
-            # otherwise, re-run the check.
-            if not self.no_cache and check in self.cache and self.cache[check].get('expires') >= time.time():
-                results.append(self.cache[check])
-            else:
-                result = await self.exec_check(check)
-                if not self.no_cache:
-                    if result.get('passed'):
-                        ttl = self.success_ttl
-                    else:
-                        ttl = self.failure_ttl
-
-                    result['expires'] = result['timestamp'] + ttl
-                    self.cache[check] = result
-
-                results.append(result)
-
-        passed = all((r['passed'] for r in results))
-        if passed:
-            msg = MSG_OK
-            if self.success_handler:
-                msg = self.success_handler(results)
-
-            return response.text(
-                body=msg,
-                status=self.success_status,
-                headers=self.success_headers,
+    def init(self, app: Sanic, uri: Optional[str] = None) -> None:
+        """Initialize the checker with the Sanic application.
+
+        In addition to registering the checker endpoint, this registers server
+        listeners to start and stop the background refresh task when the checker
+        is in background mode.
+
+        Args:
+            app: The Sanic application to register a new endpoint with.
+            uri: The URI of the endpoint to register. If not specified, the
+                checker's ``default_uri`` is used.
+        """
+        super(HealthCheck, self).init(app, uri)
+
+        if self.background:
+            app.register_listener(self.start_refresh, 'before_server_start')
+            app.register_listener(self.stop_refresh, 'before_server_stop')
+
+    async def start_refresh(self, app: Sanic, loop) -> None:
+        """Start the background task which refreshes cached check results.
+
+        This is registered as a ``before_server_start`` listener on ``init``
+        when the checker is in background mode.
+        """
+        if self.refresh_task is None:
+            self.refresh_task = loop.create_task(self._refresh())
+
+    async def stop_refresh(self, app: Sanic, loop) -> None:
+        """Stop the background task which refreshes cached check results.
+
+        This is registered as a ``before_server_stop`` listener on ``init``
+        when the checker is in background mode.
+        """
+        if self.refresh_task is not None:
+            self.refresh_task.cancel()
+            try:
+                await self.refresh_task
+            except asyncio.CancelledError:
+                pass
+            self.refresh_task = None
+
+    async def run(self, request, status_only: bool = False) -> response.HTTPResponse:
+        """Run the checks selected by the request (all checks, by default) and
+        generate an HTTP response for the results.
+
+        For a status-only response, cached results are used as they are, rather
+        than copied and annotated with their age.
+        """
+
+        checks = self.select_checks(request)
+
+        if self.is_status_only(request, status_only):
+            results = await self.run_checks(checks, self._run_check_status)
+            return self.make_status_response(results)
+
+        generation = self.generation
+        results = await self.run_checks(checks, self._run_check)
+
+        # The rendered response may only be reused if every result was read
+        # from the cache, and no results were written to the cache while the
+        # checks were run; otherwise the results gathered here may not match
+        # the current cache generation. Results which are never cached (e.g. a
+        # timed out wait for an in-flight execution, or a skipped check) are
+        # not described by the generation at all.
+        key = None
+        cached = all(r.get('cached') and not r.get('stale') for r in results)
+        if self.cache_response and not self.no_cache and cached and generation == self.generation:
+            key = generation
+            if checks is not self.checks:
+                key = (generation, tuple(id(c) for c in checks))
+
+        return self.make_response(results, key, request)
+
+    async def _run_check_status(self, check: Check, deadline: Optional[float] = None) -> Dict:
+        """Get the result for a single check, for a status-only response.
+
+        This is the same as ``_run_check``, except that a cached result is not copied.
+        """
+        return await self._run_check(check, deadline, copy=False)
+
+    async def _run_check(self, check: Check, deadline: Optional[float] = None, copy: bool = True) -> Dict:
+        """Get the result for a single check.
+
+        If the check has a cached health state which has not yet expired, the
+        cached result is used; otherwise, the check is re-run and its result
+        is cached. In background mode, the latest cached result is always used
+        if there is one, since the background task keeps it up to date.
+
+        An expired result which is still within the ``stale_ttl`` window is used,
+        and the check is re-run in the background to revalidate it. In background
+        mode, a result which the background task has not refreshed within that
+        window (or within the result's TTL, if ``stale_ttl`` is not set) is
+        reported as failed, since the check may be hung.
+
+        A cached result is copied, with ``cached`` set and its ``age``, unless
+        ``copy`` is False, in which case the cached result itself is returned.
+        """
+        if not self.no_cache and check in self.cache:
+            cached = self.cache[check]
+            now = time.time()
+            if self.background or cached.get('expires') >= now:
+                if self.metrics is not None:
+                    self.metrics.cache_hit(self.__class__.__name__, check.name)
+                if self.background and now > cached['expires'] + self._stale_limit(check, cached):
+                    return self._stale_result(check, cached, now)
+                return self._from_cache(cached, now) if copy else cached
+            if self.stale_ttl and cached.get('expires') + self.stale_ttl >= now:
+                if self.metrics is not None:
+                    self.metrics.cache_hit(self.__class__.__name__, check.name)
+                # The revalidation counts as a waiter, so it is not cancelled
+                # along with a caller which joins it.
+                self._waiters[self._get_inflight(check)] += 1
+                return self._from_cache(cached, now) if copy else cached
+
+        if self.metrics is not None and not self.no_cache:
+            self.metrics.cache_miss(self.__class__.__name__, check.name)
+        return await self._refresh_check(check, deadline)
+
+    async def _refresh_check(self, check: Check, deadline: Optional[float] = None) -> Dict:
+        """Re-run a check and cache its result.
+
+        If the check is already running, this waits for the result of the
+        in-flight execution instead of starting another one. The in-flight
+        execution is shielded, so cancelling one caller does not cancel it
+        for the others; it is only cancelled along with the last caller
+        waiting for it (e.g. when failing fast).
+
+        Each caller only waits for the in-flight execution within its own time
+        limit (see ``get_timeout``), since the execution may have been started
+        with a longer one. A caller which runs out of time gets a timed out
+        result, while the execution keeps running for the other callers.
+        """
+        future = self._get_inflight(check, deadline)
+        timeout = self.get_timeout(check, deadline)
+
+        self._waiters[future] += 1
+        try:
+            if timeout is None:
+                return await asyncio.shield(future)
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            if future.done():
+                return future.result()
+            log.error(f'{self.__class__.__name__} check "{check.name}" timed out')
+            return self._make_result(check.name, False, self.timeout_message(check, timeout), max(timeout, 0.0))
+        except asyncio.CancelledError:
+            if self._waiters.get(future) == 1:
+                future.cancel()
+            raise
+        finally:
+            if future in self._waiters:
+                self._waiters[future] -= 1
+
+    def _get_inflight(self, check: Check, deadline: Optional[float] = None) -> asyncio.Future:
+        """Get the in-flight execution of a check, starting one if the check
+        is not already running.
+        """
+        future = self._inflight.get(check)
+        if future is None:
+            future = asyncio.ensure_future(self._exec_and_cache(check, deadline))
+            self._inflight[check] = future
+            self._waiters[future] = 0
+
+            def done(f):
+                if self._inflight.get(check) is f:
+                    del self._inflight[check]
+                self._waiters.pop(f, None)
+
+            future.add_done_callback(done)
+
+        return future
+
+    async def _exec_and_cache(self, check: Check, deadline: Optional[float] = None) -> Dict:
+        """Execute a check and cache its result, if caching is enabled.
+
+        If the checker has a shared result store, an unexpired result from the
+        store is used instead of executing the check. The check is only executed
+        if this worker acquires the lease for refreshing it; otherwise, another
+        worker is already refreshing it, so its latest stored result is used.
+        If that result has expired, it is used locally until the other worker's
+        lease expires (or for at most ``LEASE_POLL_INTERVAL``), after which the
+        store is checked again. If there is no stored result yet, this waits for
+        the other worker to publish one, until its lease expires (in which case
+        this worker takes over) or this check runs out of time.
+        """
+        if self.no_cache:
+            return await self.exec_check(check, deadline)
+
+        if self.store is not None:
+            timeout = self.get_timeout(check, deadline)
+            give_up = None if timeout is None else time.time() + timeout
+
+            shared = self.store.get(check.name)
+            while True:
+                if shared is not None and shared['expires'] >= time.time():
+                    self._set_cached(check, shared)
+                    return self._from_cache(shared, time.time())
+
+                if self.store.acquire(check.name):
+                    break
+
+                if shared is not None:
+                    now = time.time()
+                    retry_at = min(self.store.lease_expires(check.name), now + LEASE_POLL_INTERVAL)
+                    shared['expires'] = max(retry_at, now + MIN_REFRESH_INTERVAL)
+                    self._set_cached(check, shared)
+                    return self._from_cache(shared, now)
+
+                if give_up is not None and time.time() >= give_up:
+                    log.error(f'{self.__class__.__name__} check "{check.name}" timed out waiting '
+                              f'for another worker to run it')
+                    return self._make_result(check.name, False, self.timeout_message(check, timeout), max(timeout, 0.0))
+
+                await asyncio.sleep(LEASE_WAIT_INTERVAL)
+                shared = self.store.get(check.name)
+
+            try:
+                result = await self._exec(check, deadline)
+            except BaseException:
+                self.store.release(check.name)
+                raise
+
+            self._cache_result(check, result)
+            self.store.put(check.name, result)
+            return result
+
+        result = await self._exec(check, deadline)
+        self._cache_result(check, result)
+        return result
+
+    async def _exec(self, check: Check, deadline: Optional[float] = None) -> Dict:
+        """Execute a check, recording its outcome with the check's circuit
+        breaker (if circuit breakers are enabled).
+        """
+        breaker = self._get_breaker(check)
+        if breaker is None:
+            return await self.exec_check(check, deadline)
+
+        breaker.trial()
+        result = await self.exec_check(check, deadline)
+        breaker.record(result['passed'])
+        result['breaker'] = breaker.state
+        return result
+
+    def _get_breaker(self, check: Check) -> Optional[CircuitBreaker]:
+        """Get the circuit breaker for a check, creating it on first use.
+
+        Returns:
+            The check's circuit breaker, or None if circuit breakers are disabled.
+        """
+        if self.breaker_threshold is None:
+            return None
+
+        breaker = self.breakers.get(check)
+        if breaker is None:
+            breaker = self.breakers[check] = CircuitBreaker(
+                threshold=self.breaker_threshold,
+                backoff=self.breaker_backoff,
+                max_backoff=self.breaker_max_backoff,
             )
+        return breaker
+
+    def _cache_result(self, check: Check, result: Dict) -> None:
+        """Store a check result in the cache, setting its expiration time
+        based on whether the check passed or failed.
 
+        While the check's circuit breaker is open, the result is kept in the
+        cache until the breaker allows the check to be tried again.
+        """
+        if result.get('passed'):
+            ttl = self.success_ttl if check.success_ttl is None else check.success_ttl
         else:
-            msg = MSG_FAIL
-            if self.failure_handler:
-                msg = self.failure_handler(results)
-
-            return response.text(
-                body=msg,
-                status=self.failure_status,
-                headers=self.failure_headers,
-            )
+            ttl = self.failure_ttl if check.failure_ttl is None else check.failure_ttl
+
+        result['expires'] = result['timestamp'] + ttl
+
+        breaker = self.breakers.get(check)
+        if breaker is not None and breaker.state == BREAKER_OPEN:
+            result['expires'] = max(result['expires'], breaker.retry_at)
+
+        self._set_cached(check, result)
+
+    def _stale_limit(self, check: Check, result: Dict) -> float:
+        """Get the time after a cached result expires for which it may still be
+        served in background mode.
+
+        This is never less than ``MAX_REFRESH_INTERVAL``, so a result is not
+        reported as stale just because the background task has yet to pick it up.
+        """
+        if self.stale_ttl is not None:
+            limit = self.stale_ttl
+        elif result.get('passed'):
+            limit = self.success_ttl if check.success_ttl is None else check.success_ttl
+        else:
+            limit = self.failure_ttl if check.failure_ttl is None else check.failure_ttl
+        return max(limit, MAX_REFRESH_INTERVAL)
+
+    def _stale_result(self, check: Check, result: Dict, now: float) -> Dict:
+        """Get a failed copy of a cached result which has not been refreshed in time."""
+        log.error(f'{self.__class__.__name__} check "{check.name}" has not been refreshed since it expired')
+        return dict(
+            self._from_cache(result, now),
+            passed=False,
+            message=MSG_STALE.format(now - result['timestamp']),
+            stale=True,
+        )
+
+    @staticmethod
+    def _from_cache(result: Dict, now: float) -> Dict:
+        """Get a copy of a cached check result, marked as served from the cache."""
+        return dict(result, cached=True, age=now - result['timestamp'])
+
+    def _set_cached(self, check: Check, result: Dict) -> None:
+        """Store a check result in the cache.
+
+        The cache generation is only advanced if the result differs from the
+        cached one, and not when the same result (e.g. a result read again from
+        the shared store) is cached with a new expiration time.
+        """
+        previous = self.cache.get(check)
+        self.cache[check] = result
+        if previous is None or any(previous[k] != result[k] for k in ('timestamp', 'passed', 'message')):
+            self.generation += 1
+
+    async def _refresh(self) -> None:
+        """Continuously refresh cached check results as they expire.
+
+        Each check is re-run once its cached result expires, so each check is
+        refreshed on its own interval (determined by its TTL). Checks added to
+        the checker after the task is started are picked up on the next cycle.
+
+        Each due check is refreshed in its own task, so a slow (or hung) check
+        does not hold back the refresh of the others; a check is not scheduled
+        again while its previous refresh is still running.
+        """
+        tasks = {}
+        # Set when a refresh completes, so its new expiry time is scheduled.
+        refreshed = asyncio.Event()
+
+        def done(check):
+            tasks.pop(check, None)
+            refreshed.set()
+
+        try:
+            while True:
+                refreshed.clear()
+                now = time.time()
+                next_expiry = now + MAX_REFRESH_INTERVAL
+                try:
+                    for check in [self.get_check(c) for c in self.checks]:
+                        if check in tasks:
+                            continue
+                        cached = self.cache.get(check)
+                        if cached is None or cached['expires'] <= now:
+                            task = tasks[check] = asyncio.ensure_future(self._refresh_due(check))
+                            task.add_done_callback(lambda _, c=check: done(c))
+                        else:
+                            next_expiry = min(next_expiry, cached['expires'])
+                except Exception:
+                    log.exception('Unexpected error while refreshing HealthCheck results')
+
+                try:
+                    await asyncio.wait_for(refreshed.wait(), max(next_expiry - time.time(), MIN_REFRESH_INTERVAL))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in list(tasks.values()):
+                task.cancel()
+
+    async def _refresh_due(self, check: Check) -> None:
+        """Refresh the cached result of a due check, in the background.
+
+        The checks which the due check depends on are run along with it, so that
+        it is only re-run if they pass; their cached results are used if they
+        have not yet expired. A due check which is skipped because a check it
+        depends on failed is cached with its skipped result, so it is not due
+        again right away.
+        """
+        async def runner(c, deadline=None):
+            if c is check:
+                return await self._refresh_check(c, deadline)
+            return await self._run_check(c, deadline)
+
+        try:
+            order = self.with_dependencies([check])
+            results = await self.run_checks(order, runner)
+            result = results[0]
+            if result.get('skipped') or result.get('cancelled'):
+                self._cache_result(check, result)
+        except Exception:
+            log.exception(f'Unexpected error while refreshing HealthCheck check "{check.name}"')
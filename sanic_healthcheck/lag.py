@@ -0,0 +1,160 @@
+"""A check of the application's event loop lag.
+
+A worker whose event loop is blocked (e.g. by a CPU-bound or blocking call in a
+request handler) can not serve requests, but a check run by the worker can not
+detect this directly: the check only runs once the loop is free again. A
+``LoopLagCheck`` instead measures the loop's scheduling lag in the background:
+a timer is scheduled on the loop at a fixed interval, and the lag is how much
+later than scheduled it actually fires. The check fails when the recent lag,
+at a given percentile, exceeds a threshold.
+
+The timer is a plain ``call_later`` callback rather than a task, and the lag
+samples are kept in a fixed-size ring buffer, so the monitor adds negligible
+overhead to the event loop.
+"""
+
+import asyncio
+import logging
+from typing import Optional, Tuple
+
+from sanic import Sanic
+
+from .buffers import RingBuffer, percentile
+from .checker import MSG_OK
+
+log = logging.getLogger(__name__)
+
+
+class LoopLagCheck:
+    """A check which fails when the event loop's scheduling lag exceeds a threshold.
+
+    The check is registered with a checker like any other check function. When
+    the checker is initialized with the application, the check registers server
+    listeners with it to start measuring the event loop lag when the server
+    starts, and to stop when it stops.
+
+    .. code-block:: python
+
+      health_check.add_check(LoopLagCheck(max_lag=0.1))
+
+    If the checker runs synchronous checks in a thread pool (``use_executor``),
+    the check can also detect that the event loop is blocked while it is blocked,
+    since the timer is overdue.
+
+    Args:
+        name: The name of the check.
+        interval: The interval (in seconds) at which the lag is measured.
+        window: The number of most recent lag samples to keep.
+        max_lag: The maximum lag (in seconds), at the given ``percentile``, before
+            the check fails.
+        percentile: The lag percentile (0-100) compared to ``max_lag``.
+    """
+
+    def __init__(
+            self,
+            name: str = 'loop_lag',
+            interval: float = 0.1,
+            window: int = 600,
+            max_lag: float = 0.1,
+            percentile: float = 99,
+    ) -> None:
+
+        self.__name__ = name
+        self.interval = interval
+        self.max_lag = max_lag
+        self.percentile = percentile
+
+        self.app = None
+        self.samples = RingBuffer(window)
+
+        self._loop = None
+        self._handle = None
+        self._expected = None
+
+    def init(self, app: Sanic) -> None:
+        """Initialize the check with the Sanic application, registering the
+        listeners which start and stop the lag monitor.
+
+        A check registered with several checkers for the same application is
+        only initialized once.
+
+        Args:
+            app: The Sanic application whose event loop to monitor.
+        """
+        if self.app is app:
+            return
+        self.app = app
+        app.register_listener(self.start_monitor, 'after_server_start')
+        app.register_listener(self.stop_monitor, 'before_server_stop')
+
+    async def start_monitor(self, app: Sanic, loop) -> None:
+        """Start measuring the event loop lag.
+
+        This is registered as an ``after_server_start`` listener on ``init``.
+        """
+        self.start(loop)
+
+    async def stop_monitor(self, app: Sanic, loop) -> None:
+        """Stop measuring the event loop lag.
+
+        This is registered as a ``before_server_stop`` listener on ``init``.
+        """
+        self.stop()
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """Start measuring the lag of an event loop.
+
+        Args:
+            loop: The event loop to monitor. If not specified, the current
+                event loop is used.
+        """
+        if self._handle is not None:
+            return
+        self._loop = loop or asyncio.get_event_loop()
+        self._schedule()
+
+    def stop(self) -> None:
+        """Stop measuring the event loop lag."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._expected = None
+
+    def _schedule(self) -> None:
+        """Schedule the next lag measurement."""
+        self._expected = self._loop.time() + self.interval
+        self._handle = self._loop.call_later(self.interval, self._tick)
+
+    def _tick(self) -> None:
+        """Record how late the timer fired, and schedule the next measurement."""
+        self.samples.append(max(self._loop.time() - self._expected, 0.0))
+        self._schedule()
+
+    def lag(self) -> float:
+        """Get the recent event loop lag at the check's ``percentile``.
+
+        If the next measurement is overdue (i.e. the event loop is blocked right
+        now), the time it is overdue by is taken into account as well.
+
+        Returns:
+            The lag (in seconds), or 0 if no lag has been measured yet.
+        """
+        lag = 0.0
+        values = self.samples.values()
+        if values:
+            lag = percentile(values, self.percentile)
+
+        expected = self._expected
+        if expected is not None:
+            lag = max(lag, self._loop.time() - expected)
+        return lag
+
+    def __call__(self) -> Tuple[bool, str]:
+        """Check the event loop lag against the threshold."""
+        lag = self.lag()
+        if lag > self.max_lag:
+            return False, f'p{self.percentile:g} event loop lag {lag:.3g}s > {self.max_lag:.3g}s'
+        return True, MSG_OK
+
+    def __repr__(self) -> str:
+        return f'<LoopLagCheck {self.__name__}>'
@@ -0,0 +1,193 @@
+"""Metrics for check execution, exported in the Prometheus text format.
+
+A ``Metrics`` exporter may be passed to any number of checkers. Each checker
+records the latency and outcome of every check it executes, along with cache
+hits and misses for checkers which cache results. The exporter exposes the
+recorded metrics on its own route (``/metrics`` by default) in the Prometheus
+text exposition format, without requiring the ``prometheus_client`` package.
+
+Recording a metric only updates preallocated counters, so it adds very little
+overhead to running a check.
+"""
+
+import bisect
+from typing import Optional, Sequence
+
+from sanic import Sanic, response
+
+CONTENT_TYPE_PROMETHEUS = 'text/plain; version=0.0.4; charset=utf-8'
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+PREFIX = 'sanic_healthcheck_check'
+
+
+class _Series:
+    """The metrics recorded for a single check."""
+
+    __slots__ = ('labels', 'buckets', 'sum', 'count', 'passed', 'failed', 'timeouts', 'cache_hits', 'cache_misses')
+
+    def __init__(self, labels: str, size: int) -> None:
+        self.labels = labels
+        # One bucket per upper bound, plus one for +Inf. Bucket counts are not
+        # cumulative; they are accumulated when the metrics are rendered.
+        self.buckets = [0] * (size + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.passed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+
+class Metrics:
+    """An exporter for check metrics, in the Prometheus text format.
+
+    The following metrics are exported, each labeled with the ``checker``
+    class name and the ``check`` name:
+
+    * ``sanic_healthcheck_check_duration_seconds``: A histogram of check execution time.
+    * ``sanic_healthcheck_check_passed_total``: The number of check executions which passed.
+    * ``sanic_healthcheck_check_failed_total``: The number of check executions which failed.
+    * ``sanic_healthcheck_check_timeouts_total``: The number of check executions which timed out.
+    * ``sanic_healthcheck_check_cache_hits_total``: The number of times a cached result was used.
+    * ``sanic_healthcheck_check_cache_misses_total``: The number of times a cached result was not available.
+
+    Args:
+        app: The Sanic application instance to register the metrics route to. If
+            not specified on initialization, the user must pass it to the ``init``
+            method to register the route with the application.
+        uri: The route URI to expose the metrics on.
+        buckets: The upper bounds (in seconds) of the check duration histogram buckets.
+        options: Any additional options to pass to the ``Sanic.add_route`` method
+            on ``init``.
+    """
+
+    default_uri = '/metrics'
+
+    def __init__(
+            self,
+            app: Optional[Sanic] = None,
+            uri: Optional[str] = None,
+            buckets: Sequence[float] = DEFAULT_BUCKETS,
+            **options,
+    ) -> None:
+
+        self.app = app
+        self.uri = uri
+        self.bounds = sorted(buckets)
+        self.options = options
+
+        self._series = {}
+
+        if self.app:
+            self.init(self.app, self.uri)
+
+    def init(self, app: Sanic, uri: Optional[str] = None) -> None:
+        """Initialize the metrics exporter with the Sanic application.
+
+        Args:
+            app: The Sanic application to register the metrics endpoint with.
+            uri: The URI of the endpoint to register. If not specified, the
+                exporter's ``default_uri`` is used.
+        """
+        if not uri:
+            uri = self.default_uri
+        app.add_route(self.export, uri, **self.options)
+
+    def observe(self, checker: str, check: str, duration: float, passed: bool, timed_out: bool = False) -> None:
+        """Record the execution of a check.
+
+        Args:
+            checker: The name of the checker which executed the check.
+            check: The name of the check.
+            duration: The time (in seconds) it took to execute the check.
+            passed: Whether the check passed.
+            timed_out: Whether the check timed out.
+        """
+        series = self._get_series(checker, check)
+        series.buckets[bisect.bisect_left(self.bounds, duration)] += 1
+        series.sum += duration
+        series.count += 1
+        if passed:
+            series.passed += 1
+        else:
+            series.failed += 1
+        if timed_out:
+            series.timeouts += 1
+
+    def cache_hit(self, checker: str, check: str) -> None:
+        """Record that a cached check result was used.
+
+        Args:
+            checker: The name of the checker.
+            check: The name of the check.
+        """
+        self._get_series(checker, check).cache_hits += 1
+
+    def cache_miss(self, checker: str, check: str) -> None:
+        """Record that a cached check result was not available.
+
+        Args:
+            checker: The name of the checker.
+            check: The name of the check.
+        """
+        self._get_series(checker, check).cache_misses += 1
+
+    def render(self) -> str:
+        """Render the recorded metrics in the Prometheus text format."""
+        series = list(self._series.values())
+        bounds = [_format_float(b) for b in self.bounds] + ['+Inf']
+
+        lines = [
+            f'# HELP {PREFIX}_duration_seconds Time taken to execute a check.',
+            f'# TYPE {PREFIX}_duration_seconds histogram',
+        ]
+        for s in series:
+            total = 0
+            for bound, count in zip(bounds, s.buckets):
+                total += count
+                lines.append(f'{PREFIX}_duration_seconds_bucket{{{s.labels},le="{bound}"}} {total}')
+            lines.append(f'{PREFIX}_duration_seconds_sum{{{s.labels}}} {_format_float(s.sum)}')
+            lines.append(f'{PREFIX}_duration_seconds_count{{{s.labels}}} {s.count}')
+
+        for name, attr, description in (
+                ('passed_total', 'passed', 'Number of check executions which passed.'),
+                ('failed_total', 'failed', 'Number of check executions which failed.'),
+                ('timeouts_total', 'timeouts', 'Number of check executions which timed out.'),
+                ('cache_hits_total', 'cache_hits', 'Number of times a cached check result was used.'),
+                ('cache_misses_total', 'cache_misses', 'Number of times a cached check result was not available.'),
+        ):
+            lines.append(f'# HELP {PREFIX}_{name} {description}')
+            lines.append(f'# TYPE {PREFIX}_{name} counter')
+            for s in series:
+                lines.append(f'{PREFIX}_{name}{{{s.labels}}} {getattr(s, attr)}')
+
+        return '\n'.join(lines) + '\n'
+
+    async def export(self, request) -> response.HTTPResponse:
+        """Generate an HTTP response exposing the recorded metrics."""
+        return response.text(
+            body=self.render(),
+            content_type=CONTENT_TYPE_PROMETHEUS,
+        )
+
+    def _get_series(self, checker: str, check: str) -> _Series:
+        """Get the metrics series for a check, creating it on first use."""
+        key = (checker, check)
+        series = self._series.get(key)
+        if series is None:
+            labels = f'checker="{_escape(checker)}",check="{_escape(check)}"'
+            series = self._series[key] = _Series(labels, len(self.bounds))
+        return series
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the Prometheus text format."""
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_float(value: float) -> str:
+    """Format a float for the Prometheus text format."""
+    return repr(float(value))
@@ -7,12 +7,22 @@ where it is fully started up and ready to receive traffic and run normally.
 This checker can be used to set up readiness probes for Kubernetes deployments:
 https://kubernetes.io/docs/tasks/configure-pod-container/configure-liveness-readiness-startup-probes/#define-readiness-probes
 
+Readiness may also be pushed by the application: rather than registering a
+check function to poll, the application can set named readiness conditions
+as things happen (e.g. once a consumer has connected, or a cache has been
+warmed). Conditions are reported alongside the results of the polled checks.
+
 This checker exposes the ``/ready`` endpoint by default.
 """
 
+import logging
+from typing import Dict
+
 from sanic import response
 
-from .checker import MSG_FAIL, MSG_OK, BaseChecker
+from .checker import BaseChecker
+
+log = logging.getLogger(__name__)
 
 
 class ReadyCheck(BaseChecker):
@@ -22,37 +32,73 @@ class ReadyCheck(BaseChecker):
     The results of registered check functions are not cached by this checker.
     There should not be a delay in determining application readiness due to
     a stale cache result.
+
+    Readiness conditions set with ``set_condition`` are held in memory and
+    reported as they were last set, after the results of the polled checks.
+    Nothing is run for them when the ready route is called.
     """
 
     default_uri = '/ready'
 
-    async def run(self, request) -> response.HTTPResponse:
-        """Run all checks and generate an HTTP response for the results."""
+    def __init__(self, *args, **kwargs) -> None:
+        # The readiness conditions pushed by the application, by name. Each is
+        # held as a prebuilt check result.
+        self.conditions = {}
+
+        super(ReadyCheck, self).__init__(*args, **kwargs)
+
+    def set_condition(self, name: str, passed: bool, message: str = '') -> Dict:
+        """Set the state of a readiness condition.
 
-        results = []
-        for check in self.checks:
-            result = await self.exec_check(check)
-            results.append(result)
+        If the condition has not been set before, it is added to the conditions
+        reported by the checker; otherwise, its state is replaced.
 
-        passed = all((r['passed'] for r in results))
-        if passed:
-            msg = MSG_OK
-            if self.success_handler:
-                msg = self.success_handler(results)
+        Args:
+            name: The name of the condition, reported as the check name in its result.
+            passed: Whether the condition is met.
+            message: A message associated with the state of the condition.
 
-            return response.text(
-                body=msg,
-                status=self.success_status,
-                headers=self.success_headers,
-            )
+        Returns:
+            The check result reported for the condition.
+        """
+        if not passed:
+            log.error(f'{self.__class__.__name__} condition "{name}" failed: {message}')
 
+        result = self._make_result(name, passed, message, 0.0)
+        result['condition'] = True
+        self.conditions[name] = result
+        return result
+
+    def clear_condition(self, name: str) -> None:
+        """Clear a readiness condition, so it is no longer reported.
+
+        Args:
+            name: The name of the condition. Clearing a condition which is not
+                set has no effect.
+        """
+        self.conditions.pop(name, None)
+
+    async def run(self, request, status_only: bool = False) -> response.HTTPResponse:
+        """Run the checks selected by the request (all checks, by default) and
+        generate an HTTP response for their results and the selected readiness
+        conditions.
+
+        Conditions are selected by name with the ``check`` query parameter, in
+        the same way as checks. Selecting checks by tag does not select any
+        conditions.
+        """
+        selection = self.get_selection(request)
+        if selection is None:
+            checks = self.checks
+            conditions = list(self.conditions.values())
         else:
-            msg = MSG_FAIL
-            if self.failure_handler:
-                msg = self.failure_handler(results)
-
-            return response.text(
-                body=msg,
-                status=self.failure_status,
-                headers=self.failure_headers,
-            )
+            names, tags = selection
+            conditions = [self.conditions[n] for n in names if n in self.conditions]
+            names = [n for n in names if n not in self.conditions]
+            checks = self.find_checks(names, tags) if names or tags else []
+
+        results = await self.run_checks(checks) if checks else []
+        results.extend(conditions)
+        if self.is_status_only(request, status_only):
+            return self.make_status_response(results)
+        return self.make_response(results, request=request)
@@ -0,0 +1,199 @@
+"""Built-in checks of the resources used by the application process.
+
+Each function in this module is a check factory: it returns a check function
+which can be registered with any checker, and which fails when a resource
+crosses the given threshold.
+
+.. code-block:: python
+
+  health_check.add_check(rss_check(max_rss=512 * 1024 ** 2))
+  health_check.add_check(disk_space_check('/var/lib/app', min_free_fraction=0.1))
+
+The checks read the process's resource usage directly from ``/proc/self``
+(so the memory, file descriptor and thread checks are only supported on
+Linux) and ``os.statvfs``, without spawning processes or requiring any
+additional packages. The values read are cached for a short time
+(``cache_ttl``), so frequent probes do not re-read them on every request.
+"""
+
+import os
+import resource
+import time
+from typing import Callable, Optional, Tuple
+
+# The default time (in seconds) to cache the values read by a resource check.
+CACHE_TTL = 1.0
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+
+
+class _Cached:
+    """A value which is read on first use and re-read after it expires."""
+
+    __slots__ = ('read', 'ttl', 'value', 'expires')
+
+    def __init__(self, read: Callable, ttl: float) -> None:
+        self.read = read
+        self.ttl = ttl
+        self.value = None
+        self.expires = 0.0
+
+    def __call__(self):
+        now = time.monotonic()
+        if now >= self.expires:
+            self.value = self.read()
+            self.expires = now + self.ttl
+        return self.value
+
+
+def read_rss() -> int:
+    """Get the resident set size (in bytes) of the current process."""
+    with open('/proc/self/statm', 'rb') as f:
+        return int(f.read().split()[1]) * _PAGE_SIZE
+
+
+def read_open_fds() -> int:
+    """Get the number of file descriptors open in the current process."""
+    # The listing includes the descriptor used to read the directory itself.
+    return len(os.listdir('/proc/self/fd')) - 1
+
+
+def read_thread_count() -> int:
+    """Get the number of threads of the current process."""
+    with open('/proc/self/stat', 'rb') as f:
+        stat = f.read()
+    # The command name (the second field) may contain spaces, so the fields
+    # are counted from the parenthesis which ends it.
+    return int(stat[stat.rindex(b')') + 2:].split()[17])
+
+
+def rss_check(max_rss: int, name: str = 'rss', cache_ttl: float = CACHE_TTL) -> Callable:
+    """Create a check which fails when the process's resident memory is too large.
+
+    Args:
+        max_rss: The maximum resident set size (in bytes) of the process.
+        name: The name of the check.
+        cache_ttl: The time (in seconds) to cache the resident set size for.
+
+    Returns:
+        The check function.
+    """
+    rss = _Cached(read_rss, cache_ttl)
+
+    def check() -> Tuple[bool, str]:
+        value = rss()
+        if value > max_rss:
+            return False, f'RSS {_format_bytes(value)} exceeds {_format_bytes(max_rss)}'
+        return True, f'RSS {_format_bytes(value)}'
+
+    check.__name__ = name
+    return check
+
+
+def open_fds_check(
+        max_fds: Optional[int] = None,
+        max_fraction: Optional[float] = 0.9,
+        name: str = 'open_fds',
+        cache_ttl: float = CACHE_TTL,
+) -> Callable:
+    """Create a check which fails when the process has too many open file descriptors.
+
+    Args:
+        max_fds: The maximum number of open file descriptors. If None, the number
+            is not checked against a fixed limit.
+        max_fraction: The maximum fraction of the process's (soft) limit on open
+            file descriptors which may be used. If None, or if the process has no
+            limit, the number is not checked against the limit.
+        name: The name of the check.
+        cache_ttl: The time (in seconds) to cache the number of open file descriptors for.
+
+    Returns:
+        The check function.
+    """
+    fds = _Cached(read_open_fds, cache_ttl)
+
+    def check() -> Tuple[bool, str]:
+        value = fds()
+        if max_fds is not None and value > max_fds:
+            return False, f'{value} open file descriptors exceeds {max_fds}'
+
+        limit, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if max_fraction is not None and limit != resource.RLIM_INFINITY and value > limit * max_fraction:
+            return False, f'{value} open file descriptors exceeds {max_fraction:.0%} of the limit of {limit}'
+        return True, f'{value} open file descriptors'
+
+    check.__name__ = name
+    return check
+
+
+def disk_space_check(
+        path: str = '/',
+        min_free: Optional[int] = None,
+        min_free_fraction: Optional[float] = 0.1,
+        name: str = 'disk_space',
+        cache_ttl: float = CACHE_TTL,
+) -> Callable:
+    """Create a check which fails when the filesystem containing a path is low
+    on free space.
+
+    Free space is the space available to unprivileged users, which excludes any
+    space reserved for the superuser.
+
+    Args:
+        path: A path on the filesystem to check.
+        min_free: The minimum free space (in bytes). If None, the free space is
+            not checked against a fixed minimum.
+        min_free_fraction: The minimum fraction of the filesystem's size which must
+            be free. If None, the free space is not checked against the size.
+        name: The name of the check.
+        cache_ttl: The time (in seconds) to cache the filesystem statistics for.
+
+    Returns:
+        The check function.
+    """
+    stat = _Cached(lambda: os.statvfs(path), cache_ttl)
+
+    def check() -> Tuple[bool, str]:
+        st = stat()
+        free = st.f_bavail * st.f_frsize
+        total = st.f_blocks * st.f_frsize
+        if min_free is not None and free < min_free:
+            return False, f'{_format_bytes(free)} free on {path}, below {_format_bytes(min_free)}'
+        if min_free_fraction is not None and total and free < total * min_free_fraction:
+            return False, f'{free / total:.1%} free on {path}, below {min_free_fraction:.1%}'
+        return True, f'{_format_bytes(free)} free on {path}'
+
+    check.__name__ = name
+    return check
+
+
+def thread_count_check(max_threads: int, name: str = 'threads', cache_ttl: float = CACHE_TTL) -> Callable:
+    """Create a check which fails when the process has too many threads.
+
+    Args:
+        max_threads: The maximum number of threads.
+        name: The name of the check.
+        cache_ttl: The time (in seconds) to cache the number of threads for.
+
+    Returns:
+        The check function.
+    """
+    threads = _Cached(read_thread_count, cache_ttl)
+
+    def check() -> Tuple[bool, str]:
+        value = threads()
+        if value > max_threads:
+            return False, f'{value} threads exceeds {max_threads}'
+        return True, f'{value} threads'
+
+    check.__name__ = name
+    return check
+
+
+def _format_bytes(value: float) -> str:
+    """Format a number of bytes for a check message."""
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if abs(value) < 1024:
+            return f'{value:.1f} {unit}' if unit != 'B' else f'{value} B'
+        value /= 1024
+    return f'{value:.1f} TiB'
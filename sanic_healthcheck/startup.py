@@ -0,0 +1,62 @@
+"""A checker for application startup.
+
+When configured with a Sanic application, this checker provides a means
+for the application to specify whether or not it has finished starting up.
+Once all of its checks have passed, the application is considered started,
+and the checker no longer runs its checks: every subsequent request gets the
+same success response.
+
+This checker can be used to set up startup probes for Kubernetes deployments:
+https://kubernetes.io/docs/tasks/configure-pod-container/configure-liveness-readiness-startup-probes/#define-startup-probes
+
+This checker exposes the ``/startup`` endpoint by default.
+"""
+
+from sanic import response
+
+from .checker import BaseChecker
+
+# The key under which the success response is cached once startup has completed.
+STARTED = 'started'
+
+
+class StartupCheck(BaseChecker):
+    """A checker allowing a Sanic application to describe when it has
+    finished starting up.
+
+    Checks are run on each request until they all pass in the same request.
+    From then on, the checker is latched in the started state, and responds
+    with the rendered success response without running any checks. This is
+    useful for checks which are expensive (e.g. cache warm-up checks) and
+    only need to pass once.
+
+    Startup only completes when all checks pass; a request which selects a
+    subset of the checks does not complete startup.
+    """
+
+    default_uri = '/startup'
+
+    # Whether startup has completed, and the check results which completed it.
+    started = False
+    results = None
+
+    async def run(self, request, status_only: bool = False) -> response.HTTPResponse:
+        """Run the checks selected by the request (all checks, by default) and
+        generate an HTTP response for the results. Once startup has completed,
+        the success response is returned without running any checks.
+        """
+        if self.started:
+            results, key = self.results, STARTED
+        else:
+            checks = self.select_checks(request)
+            results = await self.run_checks(checks)
+            key = None
+
+            if checks is self.checks and all((r['passed'] for r in results)):
+                self.started = True
+                self.results = results
+                key = STARTED
+
+        if self.is_status_only(request, status_only):
+            return self.make_status_response(results)
+        return self.make_response(results, key, request)
@@ -0,0 +1,291 @@
+"""A check result store shared between worker processes.
+
+When a Sanic application is run with multiple workers, each worker process
+has its own ``HealthCheck`` cache, so every check is run by every worker
+whenever its cached result expires. A ``SharedResultStore`` lets all workers
+on a host share check results: a worker which runs a check publishes the
+result to the store, and the other workers read it from there.
+
+The store is backed by a memory-mapped file (e.g. under ``/dev/shm``, so it
+is held in memory), so it requires no external services. The file is
+divided into fixed-size slots, one per check. Access to a slot is serialized
+between processes with ``fcntl`` record locks, and each slot carries a lease
+so that only one worker refreshes a given check at a time.
+"""
+
+import fcntl
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+import zlib
+from typing import Dict, Optional
+
+log = logging.getLogger(__name__)
+
+
+# The file header: magic bytes, format version, number of slots, slot size.
+_FILE_HEADER = struct.Struct('<4sHII')
+_MAGIC = b'SHCS'
+_VERSION = 1
+
+# The slot header: key length, lease expiration time, payload length.
+_SLOT_HEADER = struct.Struct('<HdI')
+
+MAX_KEY_SIZE = 128
+
+
+class SharedResultStore:
+    """A check result store shared by all worker processes on a host.
+
+    Results are stored by check name, so checks registered with a checker
+    which uses the store should have unique names. The file is created on
+    first use, so each worker may construct its own store for the same path,
+    but every worker must use the same ``slots`` and ``slot_size``. A file
+    with a different layout (e.g. left behind by a previous deployment) is
+    never re-initialized, since other workers may still have it mapped; the
+    store raises a ``ValueError`` instead, and the file must be removed.
+
+    Args:
+        path: The path of the file backing the store. Every worker must use the
+            same path. A path under ``/dev/shm`` keeps the file in memory.
+        slots: The maximum number of checks the store can hold results for.
+        slot_size: The size (in bytes) of each slot. A result which does not fit
+            in a slot is not shared.
+        lease_ttl: The maximum time (in seconds) a worker may hold the lease for
+            refreshing a check. If a worker fails to publish a result within this
+            time, another worker may take over the lease.
+    """
+
+    def __init__(
+            self,
+            path: str,
+            slots: int = 64,
+            slot_size: int = 4096,
+            lease_ttl: float = 30,
+    ) -> None:
+
+        self.path = path
+        self.slots = slots
+        self.slot_size = slot_size
+        self.lease_ttl = lease_ttl
+
+        self._fd = None
+        self._mmap = None
+        # The expiration time of each lease acquired by this store, which
+        # identifies the lease as held by this worker.
+        self._leases = {}
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Get the stored result for a check.
+
+        Args:
+            key: The name of the check.
+
+        Returns:
+            The most recently stored result for the check, or None if there
+            is no stored result.
+        """
+        offset = self._find(key)
+        if offset is None:
+            return None
+
+        with self._lock(offset):
+            _, _, size = _SLOT_HEADER.unpack_from(self._mmap, offset)
+            if not size:
+                return None
+            start = offset + _SLOT_HEADER.size + MAX_KEY_SIZE
+            payload = self._mmap[start:start + size]
+
+        return json.loads(payload)
+
+    def put(self, key: str, result: Dict) -> None:
+        """Store the result for a check, releasing the check's lease if this
+        worker holds it. A lease held by another worker is kept.
+
+        Args:
+            key: The name of the check.
+            result: The check result.
+        """
+        payload = json.dumps(result).encode()
+        capacity = self.slot_size - _SLOT_HEADER.size - MAX_KEY_SIZE
+        if len(payload) > capacity:
+            log.warning(f'Result for check "{key}" is too large to share ({len(payload)} bytes)')
+            self.release(key)
+            return
+
+        offset = self._find(key, create=True)
+        if offset is None:
+            return
+
+        with self._lock(offset):
+            key_size, lease, _ = _SLOT_HEADER.unpack_from(self._mmap, offset)
+            _SLOT_HEADER.pack_into(self._mmap, offset, key_size, self._released(key, lease), len(payload))
+            start = offset + _SLOT_HEADER.size + MAX_KEY_SIZE
+            self._mmap[start:start + len(payload)] = payload
+
+    def acquire(self, key: str) -> bool:
+        """Acquire the lease for refreshing a check.
+
+        Args:
+            key: The name of the check.
+
+        Returns:
+            True if the lease was acquired (or this worker already holds it);
+            False if another worker holds it.
+        """
+        offset = self._find(key, create=True)
+        if offset is None:
+            return True
+
+        now = time.time()
+        with self._lock(offset):
+            key_size, lease, size = _SLOT_HEADER.unpack_from(self._mmap, offset)
+            if lease > now and self._leases.get(key) != lease:
+                return False
+            lease = self._leases[key] = now + self.lease_ttl
+            _SLOT_HEADER.pack_into(self._mmap, offset, key_size, lease, size)
+        return True
+
+    def lease_expires(self, key: str) -> float:
+        """Get the time at which the lease for refreshing a check expires.
+
+        Args:
+            key: The name of the check.
+
+        Returns:
+            The expiration time of the lease, or 0 if the lease is not held.
+        """
+        offset = self._find(key)
+        if offset is None:
+            return 0.0
+
+        with self._lock(offset):
+            _, lease, _ = _SLOT_HEADER.unpack_from(self._mmap, offset)
+        return lease
+
+    def release(self, key: str) -> None:
+        """Release the lease for refreshing a check, if this worker holds it.
+
+        Args:
+            key: The name of the check.
+        """
+        offset = self._find(key)
+        if offset is None:
+            self._leases.pop(key, None)
+            return
+
+        with self._lock(offset):
+            key_size, lease, size = _SLOT_HEADER.unpack_from(self._mmap, offset)
+            _SLOT_HEADER.pack_into(self._mmap, offset, key_size, self._released(key, lease), size)
+
+    def _released(self, key: str, lease: float) -> float:
+        """Get the lease expiration time to store for a check once this worker
+        is done refreshing it: 0 if this worker holds the lease (or it has
+        expired), or the current lease if another worker holds it.
+
+        This must be called with the check's slot locked.
+        """
+        if self._leases.pop(key, None) == lease or lease <= time.time():
+            return 0.0
+        return lease
+
+    def close(self) -> None:
+        """Close the store's memory map and file descriptor."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _open(self) -> None:
+        """Open (creating or initializing, if needed) the backing file.
+
+        Raises:
+            ValueError: The file has already been initialized with a different layout.
+        """
+        size = _FILE_HEADER.size + self.slots * self.slot_size
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+
+        fcntl.lockf(fd, fcntl.LOCK_EX, _FILE_HEADER.size, 0)
+        try:
+            header = os.pread(fd, _FILE_HEADER.size, 0)
+            expected = _FILE_HEADER.pack(_MAGIC, _VERSION, self.slots, self.slot_size)
+            if not header.strip(b'\0'):
+                os.ftruncate(fd, size)
+                os.pwrite(fd, expected, 0)
+                header = expected
+        finally:
+            fcntl.lockf(fd, fcntl.LOCK_UN, _FILE_HEADER.size, 0)
+
+        if header != expected:
+            os.close(fd)
+            raise ValueError(f'Shared result store {self.path} has a different layout; '
+                             f'remove the file to re-initialize it')
+
+        self._fd = fd
+        self._mmap = mmap.mmap(fd, size)
+
+    def _lock(self, offset: int) -> '_SlotLock':
+        """Get a context manager which locks the slot at the given offset."""
+        return _SlotLock(self._fd, offset, self.slot_size)
+
+    def _find(self, key: str, create: bool = False) -> Optional[int]:
+        """Find the offset of the slot for a key.
+
+        Slots are assigned by hashing the key, with linear probing on
+        collision.
+
+        Args:
+            key: The key to find the slot for.
+            create: Claim an empty slot for the key if it does not have one.
+
+        Returns:
+            The offset of the key's slot, or None if the key has no slot (or,
+            when creating, if the store is full).
+        """
+        if self._mmap is None:
+            self._open()
+
+        encoded = key.encode()[:MAX_KEY_SIZE]
+        start = zlib.crc32(encoded) % self.slots
+
+        for i in range(self.slots):
+            offset = _FILE_HEADER.size + ((start + i) % self.slots) * self.slot_size
+            with self._lock(offset):
+                key_size, lease, size = _SLOT_HEADER.unpack_from(self._mmap, offset)
+                if key_size == 0:
+                    if not create:
+                        return None
+                    _SLOT_HEADER.pack_into(self._mmap, offset, len(encoded), 0, 0)
+                    key_start = offset + _SLOT_HEADER.size
+                    self._mmap[key_start:key_start + len(encoded)] = encoded
+                    return offset
+
+                key_start = offset + _SLOT_HEADER.size
+                if self._mmap[key_start:key_start + key_size] == encoded:
+                    return offset
+
+        if create:
+            log.warning(f'Shared result store {self.path} is full; check "{key}" will not be shared')
+        return None
+
+
+class _SlotLock:
+    """A context manager holding an exclusive lock on a slot of the store's file."""
+
+    __slots__ = ('fd', 'offset', 'size')
+
+    def __init__(self, fd: int, offset: int, size: int) -> None:
+        self.fd = fd
+        self.offset = offset
+        self.size = size
+
+    def __enter__(self) -> None:
+        fcntl.lockf(self.fd, fcntl.LOCK_EX, self.size, self.offset)
+
+    def __exit__(self, *args) -> None:
+        fcntl.lockf(self.fd, fcntl.LOCK_UN, self.size, self.offset)
@@ -0,0 +1,247 @@
+"""A passive check of the application's health, based on its own traffic.
+
+Active checks probe the application's dependencies with synthetic requests.
+A ``TrafficCheck`` instead observes the requests the application is already
+serving: middleware registered with the application records the latency and
+outcome of each request, and the check fails when the error rate or latency
+of any route crosses its threshold. This detects degradation without putting
+any additional load on the application's dependencies.
+
+Samples are recorded per route in fixed-size ring buffers, so recording a
+request takes constant time, and the memory used is bounded by the window
+size and the maximum number of routes. Requests which match no route are
+recorded together, so requests for arbitrary paths (e.g. from a scanner) can
+not use up the routes, and routes which have served no requests within
+``max_age`` are evicted.
+"""
+
+import logging
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from sanic import Sanic
+
+from .buffers import RingBuffer, percentile
+from .checker import MSG_OK
+
+log = logging.getLogger(__name__)
+
+# The name of the request context attribute holding the request's start time.
+_START_ATTR = 'sanic_healthcheck_start'
+
+# The route under which requests which match no route are recorded.
+UNMATCHED_ROUTE = '<unmatched>'
+
+
+class _RouteWindow:
+    """The most recent request samples recorded for a single route."""
+
+    __slots__ = ('times', 'latencies', 'errors', 'last')
+
+    def __init__(self, size: int) -> None:
+        self.times = RingBuffer(size)
+        self.latencies = RingBuffer(size)
+        self.errors = RingBuffer(size, 'B')
+        self.last = 0.0
+
+    def append(self, now: float, latency: float, error: bool) -> None:
+        self.last = now
+        self.times.append(now)
+        self.latencies.append(latency)
+        self.errors.append(error)
+
+
+class TrafficCheck:
+    """A check which fails when the application's own traffic shows that it is
+    degraded: when the error rate or latency of any route crosses a threshold.
+
+    The check is registered with a checker like any other check function. When
+    the checker is initialized with the application, the check registers request
+    and response middleware with it to record the requests it serves. Requests
+    to the routes of the checkers the check is registered with are not recorded.
+
+    .. code-block:: python
+
+      health_check.add_check(TrafficCheck(max_error_rate=0.1, max_latency=0.5))
+
+    Args:
+        name: The name of the check.
+        window: The number of most recent requests to keep for each route.
+        max_error_rate: The maximum fraction of a route's requests which may fail
+            (respond with a status of ``error_status`` or above) before the check
+            fails. If None, the error rate is not checked.
+        max_latency: The maximum latency (in seconds) of a route's requests, at the
+            given ``percentile``, before the check fails. If None, latency is not
+            checked.
+        percentile: The latency percentile (0-100) compared to ``max_latency``.
+        min_samples: The minimum number of recent requests a route must have
+            served for its thresholds to be checked. This keeps a single failed
+            request to a rarely used route from failing the check.
+        max_age: The time (in seconds) after which a request no longer counts
+            towards the error rate and latency of its route. A route which has
+            served no requests for this long is evicted.
+        max_routes: The maximum number of routes to record requests for. Requests
+            to any additional routes are not recorded until a route is evicted.
+        error_status: The lowest response status which counts as an error.
+        exclude: The route URIs of requests which should not be recorded.
+        exclude_checkers: Do not record requests to the routes of the checkers
+            the check is registered with.
+    """
+
+    def __init__(
+            self,
+            name: str = 'traffic',
+            window: int = 100,
+            max_error_rate: Optional[float] = 0.05,
+            max_latency: Optional[float] = None,
+            percentile: float = 99,
+            min_samples: int = 20,
+            max_age: float = 60,
+            max_routes: int = 100,
+            error_status: int = 500,
+            exclude: Optional[Iterable[str]] = None,
+            exclude_checkers: bool = True,
+    ) -> None:
+
+        self.__name__ = name
+        self.window = window
+        self.max_error_rate = max_error_rate
+        self.max_latency = max_latency
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.max_age = max_age
+        self.max_routes = max_routes
+        self.error_status = error_status
+        self.exclude = frozenset(exclude or ())
+        self.exclude_checkers = exclude_checkers
+
+        self.app = None
+        self.routes = {}
+
+    def init(self, app: Sanic) -> None:
+        """Initialize the check with the Sanic application, registering the
+        middleware which records the application's requests.
+
+        A check registered with several checkers for the same application is
+        only initialized once.
+
+        Args:
+            app: The Sanic application to record requests for.
+        """
+        if self.app is app:
+            return
+        self.app = app
+        app.register_middleware(self.on_request, 'request')
+        app.register_middleware(self.on_response, 'response')
+
+    def exclude_checker_routes(self, uris: Iterable[str]) -> None:
+        """Stop recording requests to a checker's own routes, unless the check
+        was created with ``exclude_checkers=False``.
+
+        This is called by each checker the check is registered with, when the
+        check is initialized.
+
+        Args:
+            uris: The route URIs of the checker.
+        """
+        if self.exclude_checkers:
+            self.exclude = self.exclude.union(uris)
+
+    async def on_request(self, request) -> None:
+        """Record the start time of a request.
+
+        This is registered as request middleware on ``init``.
+        """
+        ctx = getattr(request, 'ctx', None)
+        if ctx is not None:
+            setattr(ctx, _START_ATTR, time.perf_counter())
+        else:
+            # Requests have no context object on older versions of Sanic,
+            # but they support storing values on the request itself.
+            request[_START_ATTR] = time.perf_counter()
+
+    async def on_response(self, request, response) -> None:
+        """Record the latency and outcome of a request.
+
+        This is registered as response middleware on ``init``.
+        """
+        ctx = getattr(request, 'ctx', None)
+        if ctx is not None:
+            start = getattr(ctx, _START_ATTR, None)
+        else:
+            start = request.get(_START_ATTR)
+        if start is None or response is None:
+            return
+
+        route = getattr(request, 'uri_template', None) or UNMATCHED_ROUTE
+        self.record(route, time.perf_counter() - start, response.status >= self.error_status)
+
+    def record(self, route: str, latency: float, error: bool) -> None:
+        """Record a request served by the application.
+
+        Args:
+            route: The route URI of the request.
+            latency: The time (in seconds) it took to respond to the request.
+            error: Whether the request failed.
+        """
+        if route in self.exclude:
+            return
+
+        now = time.monotonic()
+        window = self.routes.get(route)
+        if window is None:
+            if len(self.routes) >= self.max_routes:
+                self._evict(now - self.max_age)
+                if len(self.routes) >= self.max_routes:
+                    return
+            if len(self.routes) == self.max_routes - 1:
+                log.warning(f'Traffic check "{self.__name__}" is recording the maximum of '
+                            f'{self.max_routes} routes; requests to other routes will not be recorded')
+            window = self.routes[route] = _RouteWindow(self.window)
+        window.append(now, latency, error)
+
+    def _evict(self, cutoff: float) -> None:
+        """Remove the routes which have served no requests since the cutoff time."""
+        for route, window in list(self.routes.items()):
+            if window.last < cutoff:
+                del self.routes[route]
+
+    def stats(self) -> Dict[str, Tuple[int, float, float]]:
+        """Get the recent traffic statistics of each route.
+
+        Returns:
+            The number of recent requests, the error rate, and the latency at the
+            check's ``percentile`` for each route which has served requests within
+            ``max_age``.
+        """
+        cutoff = time.monotonic() - self.max_age
+        self._evict(cutoff)
+        stats = {}
+        for route, window in list(self.routes.items()):
+            latencies = []
+            errors = 0
+            for t, latency, error in zip(window.times.values(), window.latencies.values(), window.errors.values()):
+                if t >= cutoff:
+                    latencies.append(latency)
+                    errors += error
+            if latencies:
+                stats[route] = (len(latencies), errors / len(latencies), percentile(latencies, self.percentile))
+        return stats
+
+    def __call__(self) -> Tuple[bool, str]:
+        """Check the recent traffic of each route against the thresholds."""
+        failures = []
+        for route, (count, error_rate, latency) in self.stats().items():
+            if count < self.min_samples:
+                continue
+            if self.max_error_rate is not None and error_rate > self.max_error_rate:
+                failures.append(f'{route}: error rate {error_rate:.1%} > {self.max_error_rate:.1%}')
+            if self.max_latency is not None and latency > self.max_latency:
+                failures.append(f'{route}: p{self.percentile:g} latency {latency:.3g}s > {self.max_latency:.3g}s')
+
+        if failures:
+            return False, '; '.join(failures)
+        return True, MSG_OK
+
+    def __repr__(self) -> str:
+        return f'<TrafficCheck {self.__name__}>'
@@ -0,0 +1,32 @@
+from types import SimpleNamespace
+
+from sanic.request import RequestParameters
+
+
+class App:
+    """A minimal stand-in for a Sanic application, recording the routes, listeners
+    and middleware registered with it."""
+
+    def __init__(self):
+        self.ctx = SimpleNamespace()
+        self.routes = []
+        self.listeners = []
+        self.middleware = []
+
+    def add_route(self, handler, uri, **kwargs):
+        self.routes.append((handler, uri, kwargs))
+
+    def register_listener(self, listener, event):
+        self.listeners.append((listener, event))
+
+    def register_middleware(self, middleware, attach_to='request'):
+        self.middleware.append((middleware, attach_to))
+
+
+class Request:
+    """A minimal stand-in for a Sanic request with a method, query parameters and headers."""
+
+    def __init__(self, method='GET', headers=None, **args):
+        self.method = method
+        self.headers = headers or {}
+        self.args = RequestParameters({k: v if isinstance(v, list) else [v] for k, v in args.items()})
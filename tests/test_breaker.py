@@ -0,0 +1,121 @@
+
+import time
+
+import pytest
+
+from sanic_healthcheck import HealthCheck
+from sanic_healthcheck.breaker import (BREAKER_CLOSED, BREAKER_HALF_OPEN,
+                                       BREAKER_OPEN, CircuitBreaker)
+
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(threshold=3, backoff=10, jitter=0)
+
+    breaker.record(False)
+    breaker.record(False)
+    assert breaker.state == BREAKER_CLOSED
+
+    breaker.record(False)
+    assert breaker.state == BREAKER_OPEN
+    assert breaker.retry_at == pytest.approx(time.time() + 10, abs=1)
+
+
+def test_breaker_resets_on_success():
+    breaker = CircuitBreaker(threshold=2, jitter=0)
+
+    breaker.record(False)
+    breaker.record(True)
+    breaker.record(False)
+    assert breaker.state == BREAKER_CLOSED
+    assert breaker.failures == 1
+
+
+def test_breaker_backoff():
+    breaker = CircuitBreaker(threshold=1, backoff=10, max_backoff=30, jitter=0)
+
+    breaker.record(False)
+    assert breaker.retry_at == pytest.approx(time.time() + 10, abs=1)
+
+    breaker.trial()
+    assert breaker.state == BREAKER_HALF_OPEN
+    breaker.record(False)
+    assert breaker.state == BREAKER_OPEN
+    assert breaker.retry_at == pytest.approx(time.time() + 20, abs=1)
+
+    breaker.trial()
+    breaker.record(False)
+    assert breaker.retry_at == pytest.approx(time.time() + 30, abs=1)
+
+    breaker.trial()
+    breaker.record(True)
+    assert breaker.state == BREAKER_CLOSED
+    assert breaker.opens == 0
+
+
+def test_breaker_backoff_many_opens():
+    breaker = CircuitBreaker(threshold=1, backoff=0.5, max_backoff=30, jitter=0)
+    breaker.opens = 1024
+
+    breaker.record(False)
+    assert breaker.opens == 1025
+    assert breaker.retry_at == pytest.approx(time.time() + 30, abs=1)
+
+
+def test_breaker_jitter():
+    breaker = CircuitBreaker(threshold=1, backoff=10, jitter=0.5)
+
+    breaker.record(False)
+    assert time.time() + 4 < breaker.retry_at < time.time() + 16
+
+
+@pytest.mark.asyncio
+async def test_health_check_breaker():
+    calls = 0
+
+    def check1():
+        nonlocal calls
+        calls += 1
+        return False, 'down'
+
+    checker = HealthCheck(
+        checks=[check1],
+        failure_ttl=0,
+        breaker_threshold=2,
+        breaker_backoff=60,
+    )
+    check = checker.checks[0]
+
+    resp = await checker.run(None)
+    assert resp.status == 500
+    assert checker.cache[check]['breaker'] == BREAKER_CLOSED
+
+    checker.cache[check]['expires'] = 0
+    await checker.run(None)
+    assert calls == 2
+    assert checker.cache[check]['breaker'] == BREAKER_OPEN
+    assert checker.cache[check]['expires'] >= time.time() + 30
+
+    # While the breaker is open, the failed result is served without running the check.
+    for _ in range(3):
+        resp = await checker.run(None)
+        assert resp.status == 500
+    assert calls == 2
+
+    # Once the backoff elapses, the check is tried again.
+    checker.cache[check]['expires'] = 0
+    await checker.run(None)
+    assert calls == 3
+    assert checker.breakers[check].opens == 2
+
+
+@pytest.mark.asyncio
+async def test_health_check_no_breaker():
+
+    def check1():
+        return False, 'down'
+
+    checker = HealthCheck(checks=[check1])
+
+    await checker.run(None)
+    assert 'breaker' not in checker.cache[checker.checks[0]]
+    assert checker.breakers == {}
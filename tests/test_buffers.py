@@ -0,0 +1,44 @@
+
+import pytest
+
+from sanic_healthcheck.buffers import RingBuffer, percentile
+
+
+def test_ring_buffer_append():
+    buffer = RingBuffer(3)
+    assert len(buffer) == 0
+    assert buffer.values() == []
+
+    buffer.append(1)
+    buffer.append(2)
+    assert len(buffer) == 2
+    assert buffer.values() == [1, 2]
+
+
+def test_ring_buffer_overwrites_oldest():
+    buffer = RingBuffer(3)
+    for value in range(5):
+        buffer.append(value)
+
+    assert len(buffer) == 3
+    assert buffer.values() == [2, 3, 4]
+
+    buffer.clear()
+    assert len(buffer) == 0
+    assert buffer.values() == []
+
+
+def test_ring_buffer_invalid_size():
+    with pytest.raises(ValueError):
+        RingBuffer(0)
+
+
+@pytest.mark.parametrize('q,expected', [
+    (0, 1),
+    (50, 5),
+    (90, 9),
+    (99, 10),
+    (100, 10),
+])
+def test_percentile(q, expected):
+    assert percentile([10, 1, 9, 2, 8, 3, 7, 4, 6, 5], q) == expected
@@ -1,11 +1,17 @@
-
+import asyncio
 import math
+import socket
+import threading
 import time
 
 import pytest
 from sanic import Sanic
+from sanic.exceptions import NotFound
 
-from sanic_healthcheck import HealthCheck
+from sanic_healthcheck import Check, CheckContext, HealthCheck, Metrics
+from sanic_healthcheck.checker import (MSG_CANCELLED, MSG_DEADLINE,
+                                       MSG_SKIPPED, MSG_TIMEOUT, make_etag)
+from tests import App, Request
 
 
 def test_init_with_app():
@@ -52,11 +58,15 @@ async def test_exec_check_passes():
     resp = await checker.exec_check(test_check)
 
     assert isinstance(resp, dict)
-    assert len(resp) == 4
+    assert len(resp) == 8
     assert resp['check'] == 'test_check'
     assert resp['message'] == 'test message'
     assert resp['passed'] is True
     assert math.isclose(resp['timestamp'], now, rel_tol=1)
+    assert resp['duration'] >= 0
+    assert resp['cached'] is False
+    assert resp['age'] == 0
+    assert resp['expires'] is None
 
 
 @pytest.mark.asyncio
@@ -70,11 +80,15 @@ async def test_exec_check_passes_coro():
     resp = await checker.exec_check(test_check)
 
     assert isinstance(resp, dict)
-    assert len(resp) == 4
+    assert len(resp) == 8
     assert resp['check'] == 'test_check'
     assert resp['message'] == 'test message'
     assert resp['passed'] is True
     assert math.isclose(resp['timestamp'], now, rel_tol=1)
+    assert resp['duration'] >= 0
+    assert resp['cached'] is False
+    assert resp['age'] == 0
+    assert resp['expires'] is None
 
 
 @pytest.mark.asyncio
@@ -88,11 +102,15 @@ async def test_exec_check_fails():
     resp = await checker.exec_check(test_check)
 
     assert isinstance(resp, dict)
-    assert len(resp) == 4
+    assert len(resp) == 8
     assert resp['check'] == 'test_check'
     assert resp['message'] == 'test message'
     assert resp['passed'] is False
     assert math.isclose(resp['timestamp'], now, rel_tol=1)
+    assert resp['duration'] >= 0
+    assert resp['cached'] is False
+    assert resp['age'] == 0
+    assert resp['expires'] is None
 
 
 @pytest.mark.asyncio
@@ -106,11 +124,15 @@ async def test_exec_check_fails_coro():
     resp = await checker.exec_check(test_check)
 
     assert isinstance(resp, dict)
-    assert len(resp) == 4
+    assert len(resp) == 8
     assert resp['check'] == 'test_check'
     assert resp['message'] == 'test message'
     assert resp['passed'] is False
     assert math.isclose(resp['timestamp'], now, rel_tol=1)
+    assert resp['duration'] >= 0
+    assert resp['cached'] is False
+    assert resp['age'] == 0
+    assert resp['expires'] is None
 
 
 @pytest.mark.asyncio
@@ -124,11 +146,15 @@ async def test_exec_check_exception():
     resp = await checker.exec_check(test_check)
 
     assert isinstance(resp, dict)
-    assert len(resp) == 4
+    assert len(resp) == 8
     assert resp['check'] == 'test_check'
     assert resp['message'] == 'Exception raised: ValueError: test error'
     assert resp['passed'] is False
     assert math.isclose(resp['timestamp'], now, rel_tol=1)
+    assert resp['duration'] >= 0
+    assert resp['cached'] is False
+    assert resp['age'] == 0
+    assert resp['expires'] is None
 
 
 @pytest.mark.asyncio
@@ -142,8 +168,650 @@ async def test_exec_check_exception_coro():
     resp = await checker.exec_check(test_check)
 
     assert isinstance(resp, dict)
-    assert len(resp) == 4
+    assert len(resp) == 8
     assert resp['check'] == 'test_check'
     assert resp['message'] == 'Exception raised: ValueError: test error'
     assert resp['passed'] is False
     assert math.isclose(resp['timestamp'], now, rel_tol=1)
+    assert resp['duration'] >= 0
+    assert resp['cached'] is False
+    assert resp['age'] == 0
+    assert resp['expires'] is None
+
+
+@pytest.mark.asyncio
+async def test_run_checks_sequential():
+    checker = HealthCheck()
+
+    def check1():
+        return True, 'one'
+
+    async def check2():
+        return False, 'two'
+
+    results = await checker.run_checks([check1, check2])
+
+    assert [r['check'] for r in results] == ['check1', 'check2']
+    assert [r['passed'] for r in results] == [True, False]
+
+
+@pytest.mark.asyncio
+async def test_run_checks_concurrent_keeps_order():
+    checker = HealthCheck(concurrent=True)
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return True, 'slow'
+
+    async def fast():
+        return True, 'fast'
+
+    start = time.monotonic()
+    results = await checker.run_checks([slow, fast, slow])
+    elapsed = time.monotonic() - start
+
+    assert [r['check'] for r in results] == ['slow', 'fast', 'slow']
+    assert elapsed < 0.1
+
+
+@pytest.mark.asyncio
+async def test_run_checks_concurrent_max_concurrency():
+    checker = HealthCheck(concurrent=True, max_concurrency=2)
+    running = 0
+    peak = 0
+
+    async def test_check():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return True, ''
+
+    results = await checker.run_checks([Check(test_check) for _ in range(6)])
+
+    assert len(results) == 6
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_exec_check_timeout():
+    checker = HealthCheck(timeout=0.01)
+
+    async def test_check():
+        await asyncio.sleep(1)
+        return True, 'test message'
+
+    resp = await checker.exec_check(test_check)
+
+    assert resp['check'] == 'test_check'
+    assert resp['message'] == MSG_TIMEOUT.format(0.01)
+    assert resp['passed'] is False
+
+
+@pytest.mark.asyncio
+async def test_exec_check_timeout_per_check():
+    checker = HealthCheck(timeout=1)
+
+    async def test_check():
+        await asyncio.sleep(1)
+        return True, 'test message'
+
+    check = checker.add_check(test_check, timeout=0.01)
+    assert checker.get_timeout(check) == 0.01
+
+    resp = await checker.exec_check(check)
+
+    assert resp['message'] == MSG_TIMEOUT.format(0.01)
+    assert resp['passed'] is False
+
+
+@pytest.mark.asyncio
+async def test_exec_check_timeout_exception_handler():
+
+    def handler(check, info):
+        assert info[0] is asyncio.TimeoutError
+        return False, 'handled timeout'
+
+    checker = HealthCheck(timeout=0.01, exception_handler=handler)
+
+    async def test_check():
+        await asyncio.sleep(1)
+        return True, 'test message'
+
+    resp = await checker.exec_check(test_check)
+
+    assert resp['message'] == 'handled timeout'
+    assert resp['passed'] is False
+
+
+@pytest.mark.asyncio
+async def test_run_checks_deadline():
+    checker = HealthCheck(deadline=0.05)
+    called = False
+
+    async def slow():
+        await asyncio.sleep(1)
+        return True, ''
+
+    def after():
+        nonlocal called
+        called = True
+        return True, ''
+
+    start = time.monotonic()
+    results = await checker.run_checks([slow, after])
+
+    assert time.monotonic() - start < 0.5
+    assert results[0]['passed'] is False
+    assert results[0]['message'] == MSG_DEADLINE
+    assert results[1]['passed'] is False
+    assert results[1]['message'] == MSG_DEADLINE
+    assert called is False
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('use_executor', [False, True])
+async def test_exec_check_own_timeout_error(use_executor):
+    metrics = Metrics()
+    checker = HealthCheck(timeout=1, use_executor=use_executor, metrics=metrics)
+
+    def sync_check():
+        raise socket.timeout('timed out')
+
+    async def async_check():
+        raise asyncio.TimeoutError
+
+    resp = await checker.exec_check(sync_check)
+    resp_coro = await checker.exec_check(async_check)
+    await checker.stop_executor(None, None)
+
+    assert resp['passed'] is False
+    assert resp['message'].startswith('Exception raised: ')
+    assert resp_coro['passed'] is False
+    assert resp_coro['message'].startswith('Exception raised: ')
+    assert all(s.timeouts == 0 for s in metrics._series.values())
+
+
+@pytest.mark.asyncio
+async def test_exec_check_executor():
+    checker = HealthCheck(use_executor=True, max_workers=2)
+
+    def test_check():
+        return True, threading.current_thread().name
+
+    resp = await checker.exec_check(test_check)
+
+    assert resp['passed'] is True
+    assert resp['message'].startswith('HealthCheck')
+    assert checker.executor is not None
+
+    await checker.stop_executor(None, None)
+    assert checker.executor is None
+
+
+@pytest.mark.asyncio
+async def test_exec_check_context():
+    checker = HealthCheck(use_executor=True)
+    contexts = []
+
+    def sync_check(context):
+        contexts.append(context)
+        return True, threading.current_thread().name
+
+    async def async_check(context):
+        contexts.append(context)
+        return True, ''
+
+    def no_context():
+        return True, ''
+
+    checker.add_check(sync_check, context=True)
+    checker.add_check(async_check, context=True)
+    checker.add_check(no_context)
+
+    results = await checker.run_checks(checker.checks)
+    await checker.stop_executor(None, None)
+
+    assert [r['passed'] for r in results] == [True, True, True]
+    assert results[0]['message'].startswith('HealthCheck')
+    assert len(contexts) == 2
+    assert contexts[0] is contexts[1]
+    assert isinstance(contexts[0], CheckContext)
+    assert contexts[0].checker is checker
+    assert contexts[0].app is None
+    assert contexts[0].ctx is None
+
+
+def test_get_context_app():
+    checker = HealthCheck()
+    assert checker.get_context().app is None
+
+    app = App()
+    checker.init(app)
+    context = checker.get_context()
+
+    assert context.app is app
+    assert context.ctx is app.ctx
+    assert checker.get_context() is context
+
+
+@pytest.mark.asyncio
+async def test_exec_check_executor_timeout():
+    checker = HealthCheck(use_executor=True, timeout=0.01)
+
+    def test_check():
+        time.sleep(0.1)
+        return True, 'test message'
+
+    resp = await checker.exec_check(test_check)
+
+    assert resp['passed'] is False
+    assert resp['message'] == MSG_TIMEOUT.format(0.01)
+
+    await checker.stop_executor(None, None)
+
+
+def test_init_executor_listeners():
+    app = App()
+    checker = HealthCheck(app=app, use_executor=True)
+
+    assert app.routes == [(checker.run, '/health', {'methods': ['GET', 'HEAD']})]
+    assert app.listeners == [
+        (checker.start_executor, 'before_server_start'),
+        (checker.stop_executor, 'after_server_stop'),
+    ]
+
+
+def test_add_check_options():
+    checker = HealthCheck()
+
+    def test_check():
+        return True, ''
+
+    check = checker.add_check(test_check, name='custom', timeout=1, tags=['critical'])
+
+    assert isinstance(check, Check)
+    assert checker.checks == [check]
+    assert check.fn is test_check
+    assert check.name == 'custom'
+    assert check.timeout == 1
+    assert check.tags == ('critical',)
+    assert check() == (True, '')
+
+
+def test_add_check_spec():
+    checker = HealthCheck()
+
+    def test_check():
+        return True, ''
+
+    check = Check(test_check, success_ttl=60)
+    assert checker.add_check(check) is check
+    assert checker.checks == [check]
+    assert check.name == 'test_check'
+
+
+def test_check_decorator():
+    checker = HealthCheck()
+
+    @checker.check
+    def check1():
+        return True, ''
+
+    @checker.check(name='second', failure_ttl=1)
+    async def check2():
+        return True, ''
+
+    assert [c.name for c in checker.checks] == ['check1', 'second']
+    assert checker.checks[0].fn is check1
+    assert checker.checks[1].fn is check2
+    assert checker.checks[1].failure_ttl == 1
+
+
+@pytest.mark.asyncio
+async def test_exec_check_spec_name():
+    checker = HealthCheck()
+
+    def test_check():
+        return True, 'test message'
+
+    resp = await checker.exec_check(Check(test_check, name='custom'))
+
+    assert resp['check'] == 'custom'
+    assert resp['passed'] is True
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('concurrent', [False, True])
+async def test_run_checks_dependencies(concurrent):
+    checker = HealthCheck(concurrent=concurrent)
+    calls = []
+
+    def db():
+        calls.append('db')
+        return False, 'no connection'
+
+    def table():
+        calls.append('table')
+        return True, ''
+
+    def cache():
+        calls.append('cache')
+        return True, ''
+
+    def cache_warm():
+        calls.append('cache_warm')
+        return True, ''
+
+    results = await checker.run_checks([
+        Check(table, depends_on=['db']),
+        Check(cache_warm, depends_on=['cache']),
+        db,
+        cache,
+    ])
+
+    assert [r['check'] for r in results] == ['table', 'cache_warm', 'db', 'cache']
+    assert [r['passed'] for r in results] == [False, True, False, True]
+    assert results[0]['skipped'] is True
+    assert results[0]['message'] == MSG_SKIPPED.format('db')
+    assert 'skipped' not in results[1]
+    assert 'table' not in calls
+    assert calls.index('cache') < calls.index('cache_warm')
+
+
+@pytest.mark.asyncio
+async def test_run_checks_dependencies_parallel():
+    checker = HealthCheck(concurrent=True)
+
+    async def first():
+        await asyncio.sleep(0.05)
+        return True, ''
+
+    async def second():
+        await asyncio.sleep(0.05)
+        return True, ''
+
+    async def third():
+        return True, ''
+
+    start = time.monotonic()
+    results = await checker.run_checks([
+        first,
+        second,
+        Check(third, depends_on=['first', 'second']),
+    ])
+
+    assert all(r['passed'] for r in results)
+    assert time.monotonic() - start < 0.09
+
+
+@pytest.mark.asyncio
+async def test_run_checks_unknown_dependency():
+    checker = HealthCheck()
+
+    def test_check():
+        return True, ''
+
+    with pytest.raises(ValueError):
+        await checker.run_checks([Check(test_check, depends_on=['missing'])])
+
+
+def test_init_validates_dependencies():
+
+    def test_check():
+        return True, ''
+
+    app = App()
+    with pytest.raises(ValueError):
+        HealthCheck(app=app, checks=[Check(test_check, depends_on=['missing'])])
+    assert app.routes == []
+
+    with pytest.raises(ValueError):
+        HealthCheck(app=app, checks=[
+            Check(test_check, name='a', depends_on=['b']),
+            Check(test_check, name='b', depends_on=['a']),
+        ])
+
+    checker = HealthCheck(app=app, checks=[Check(test_check, name='db')])
+    with pytest.raises(ValueError):
+        checker.add_check(test_check, name='table', depends_on=['typo'], tags=['data'])
+
+    assert [c.name for c in checker.checks] == ['db']
+    assert list(checker.checks_by_name) == ['db']
+    assert checker.checks_by_tag == {}
+
+    table = checker.add_check(test_check, name='table', depends_on=['db'])
+    assert checker.checks[-1] is table
+
+
+@pytest.mark.asyncio
+async def test_run_checks_dependency_cycle():
+    checker = HealthCheck()
+
+    def test_check():
+        return True, ''
+
+    with pytest.raises(ValueError):
+        await checker.run_checks([
+            Check(test_check, name='a', depends_on=['b']),
+            Check(test_check, name='b', depends_on=['a']),
+        ])
+
+
+@pytest.mark.asyncio
+async def test_run_checks_fail_fast_concurrent():
+    checker = HealthCheck(concurrent=True, fail_fast=True)
+
+    async def slow():
+        await asyncio.sleep(1)
+        return True, ''
+
+    async def fast():
+        return True, ''
+
+    async def critical():
+        await asyncio.sleep(0.01)
+        return False, 'down'
+
+    start = time.monotonic()
+    results = await checker.run_checks([slow, fast, Check(critical, critical=True)])
+
+    assert time.monotonic() - start < 0.5
+    assert [r['check'] for r in results] == ['slow', 'fast', 'critical']
+    assert results[0]['passed'] is False
+    assert results[0]['cancelled'] is True
+    assert results[0]['message'] == MSG_CANCELLED.format('critical')
+    assert results[1]['passed'] is True
+    assert results[2]['passed'] is False
+    assert results[2]['message'] == 'down'
+
+
+@pytest.mark.asyncio
+async def test_run_checks_fail_fast_sequential():
+    checker = HealthCheck(fail_fast=True)
+    calls = []
+
+    def first():
+        calls.append('first')
+        return False, ''
+
+    def critical():
+        calls.append('critical')
+        return False, 'down'
+
+    def last():
+        calls.append('last')
+        return True, ''
+
+    results = await checker.run_checks([first, Check(critical, critical=True), last])
+
+    assert calls == ['first', 'critical']
+    assert 'cancelled' not in results[0]
+    assert results[2]['cancelled'] is True
+    assert results[2]['passed'] is False
+
+
+@pytest.mark.asyncio
+async def test_run_checks_no_fail_fast():
+    checker = HealthCheck(concurrent=True)
+
+    async def slow():
+        await asyncio.sleep(0.02)
+        return True, ''
+
+    async def critical():
+        return False, 'down'
+
+    results = await checker.run_checks([slow, Check(critical, critical=True)])
+
+    assert results[0]['passed'] is True
+    assert results[1]['passed'] is False
+
+
+def test_select_checks():
+    checker = HealthCheck()
+
+    def test_check():
+        return True, ''
+
+    db = checker.add_check(test_check, name='db', tags=['critical'])
+    table = checker.add_check(test_check, name='table', depends_on=['db'])
+    cache = checker.add_check(test_check, name='cache', tags=['critical', 'cache'])
+    other = checker.add_check(test_check, name='other')
+
+    assert checker.select_checks(None) is checker.checks
+    assert checker.select_checks(Request()) is checker.checks
+    assert checker.select_checks(Request(foo='bar')) is checker.checks
+
+    assert checker.select_checks(Request(check='other')) == [other]
+    assert checker.select_checks(Request(check=['other', 'cache'])) == [other, cache]
+    assert checker.select_checks(Request(check='other,cache')) == [other, cache]
+    assert checker.select_checks(Request(tag='critical')) == [db, cache]
+    assert checker.select_checks(Request(tag='cache', check='other')) == [other, cache]
+
+    # Dependencies of selected checks are selected too.
+    assert checker.select_checks(Request(check='table')) == [table, db]
+
+
+def test_select_checks_not_found():
+    checker = HealthCheck()
+
+    def test_check():
+        return True, ''
+
+    checker.add_check(test_check, name='db', tags=['critical'])
+
+    with pytest.raises(NotFound):
+        checker.select_checks(Request(check='missing'))
+
+    with pytest.raises(NotFound):
+        checker.select_checks(Request(tag='missing'))
+
+
+def test_make_etag():
+    results = [
+        {'check': 'db', 'passed': True, 'message': 'ok', 'timestamp': 1},
+        {'check': 'cache', 'passed': True, 'message': 'ok', 'timestamp': 1},
+    ]
+    tag = make_etag(results)
+
+    assert tag.startswith('W/"') and tag.endswith('"')
+    # Timing details do not change the fingerprint.
+    assert make_etag([dict(r, timestamp=2) for r in results]) == tag
+    assert make_etag([dict(results[0], passed=False), results[1]]) != tag
+    assert make_etag([dict(results[0], message='slow'), results[1]]) != tag
+    assert make_etag(results[::-1]) != tag
+
+
+@pytest.mark.asyncio
+async def test_run_etag():
+    calls = []
+
+    def test_check():
+        return True, 'test message'
+
+    def handler(results):
+        calls.append(results)
+        return 'handler called'
+
+    checker = HealthCheck(checks=[test_check], etag=True, success_handler=handler, success_headers={'foo': 'bar'})
+
+    resp = await checker.run(None)
+    tag = resp.headers['ETag']
+
+    assert resp.status == 200
+    assert resp.headers['foo'] == 'bar'
+    assert checker.success_headers == {'foo': 'bar'}
+    assert len(calls) == 1
+
+    for value in (tag, tag[2:], f'"other", {tag}', '*'):
+        resp = await checker.run(Request(headers={'If-None-Match': value}))
+
+        assert resp.status == 304
+        assert resp.headers['ETag'] == tag
+        assert not resp.body
+        assert len(calls) == 1
+
+    resp = await checker.run(Request(headers={'If-None-Match': '"other"'}))
+
+    assert resp.status == 200
+    assert resp.body == b'handler called'
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_run_etag_cached_response():
+    calls = []
+
+    def test_check():
+        return True, 'test message'
+
+    def handler(results):
+        calls.append(results)
+        return 'handler called'
+
+    checker = HealthCheck(checks=[test_check], etag=True, cache_response=True, success_handler=handler)
+
+    # The first request writes the result to the cache, so the response is
+    # only cached from the second request.
+    await checker.run(None)
+    resp = await checker.run(None)
+    tag = resp.headers['ETag']
+    resp = await checker.run(None)
+
+    assert resp.headers['ETag'] == tag
+    assert len(calls) == 2
+
+    resp = await checker.run(Request(headers={'If-None-Match': tag}))
+
+    assert resp.status == 304
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_run_no_etag():
+    checker = HealthCheck()
+
+    resp = await checker.run(Request(headers={'If-None-Match': '*'}))
+
+    assert resp.status == 200
+    assert 'ETag' not in resp.headers
+
+
+def test_init_routes():
+    app = App()
+    checker = HealthCheck(app=app, status_uri='/health/status')
+
+    assert app.routes == [
+        (checker.run, '/health', {'methods': ['GET', 'HEAD']}),
+        (checker.run_status, '/health/status', {'methods': ['GET', 'HEAD']}),
+    ]
+
+    app = App()
+    checker = HealthCheck(app=app, methods=['GET'], name='health')
+
+    assert app.routes == [
+        (checker.run, '/health', {'methods': ['GET'], 'name': 'health'}),
+    ]
+    assert checker.options == {'methods': ['GET'], 'name': 'health'}
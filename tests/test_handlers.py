@@ -70,3 +70,59 @@ def test_json_failure_handler_no_results():
     assert loaded['status'] == 'failure'
     assert math.isclose(loaded['timestamp'], now, rel_tol=1)
     assert loaded['results'] == []
+
+
+def test_get_json_encoder():
+    encoder = handlers.get_json_encoder()
+
+    actual = encoder({'test': 'foo'})
+    assert isinstance(actual, bytes)
+    assert json.loads(actual) == {'test': 'foo'}
+
+
+def test_get_json_encoder_stdlib(monkeypatch):
+    monkeypatch.setattr(handlers, 'orjson', None)
+    monkeypatch.setattr(handlers, 'ujson', None)
+
+    encoder = handlers.get_json_encoder()
+
+    actual = encoder({'test': 'foo'})
+    assert actual == b'{"test": "foo"}'
+
+
+def test_make_json_success_handler():
+
+    results = [
+        {'test': 'foo'},
+        {'test': 'bar'},
+    ]
+
+    now = time.time()
+    handler = handlers.make_json_success_handler()
+    actual = handler(results)
+    assert isinstance(actual, bytes)
+
+    loaded = json.loads(actual)
+    assert loaded['status'] == 'success'
+    assert math.isclose(loaded['timestamp'], now, rel_tol=1)
+    assert loaded['results'] == results
+
+
+def test_make_json_failure_handler_custom_encoder():
+
+    def encoder(obj):
+        return json.dumps(obj, sort_keys=True).encode()
+
+    results = [
+        {'test': 'foo'},
+    ]
+
+    now = time.time()
+    handler = handlers.make_json_failure_handler(encoder)
+    actual = handler(results)
+    assert isinstance(actual, bytes)
+
+    loaded = json.loads(actual)
+    assert loaded['status'] == 'failure'
+    assert math.isclose(loaded['timestamp'], now, rel_tol=1)
+    assert loaded['results'] == results
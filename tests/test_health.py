@@ -1,8 +1,16 @@
 
+import asyncio
+import json
+import time
+
 import pytest
 
-from sanic_healthcheck import HealthCheck
-from sanic_healthcheck.checker import MSG_FAIL, MSG_OK
+from sanic_healthcheck import Check, HealthCheck
+from sanic_healthcheck.checker import (MSG_DEADLINE, MSG_FAIL, MSG_OK,
+                                       MSG_TIMEOUT)
+from sanic_healthcheck.handlers import (json_failure_handler,
+                                        json_success_handler)
+from tests import Request
 
 
 @pytest.mark.asyncio
@@ -193,3 +201,616 @@ async def test_run_custom_failure_data():
     assert resp.body.decode() == 'handler called'
 
     assert len(checker.cache) == 1
+
+
+def test_background_requires_cache():
+    with pytest.raises(ValueError):
+        HealthCheck(background=True, no_cache=True)
+
+
+@pytest.mark.asyncio
+async def test_run_background():
+    calls = 0
+
+    def check1():
+        nonlocal calls
+        calls += 1
+        return True, ''
+
+    checker = HealthCheck(
+        checks=[check1],
+        background=True,
+        success_ttl=0.05,
+    )
+
+    await checker.start_refresh(None, asyncio.get_event_loop())
+    await asyncio.sleep(0.01)
+    assert calls == 1
+    assert len(checker.cache) == 1
+
+    # Requests only read the cached snapshot, even once it has expired.
+    checker.cache[checker.checks[0]]['expires'] = time.time() - 0.01
+    resp = await checker.run(None)
+    assert resp.status == 200
+    assert calls == 1
+
+    await asyncio.sleep(0.1)
+    assert calls >= 2
+
+    await checker.stop_refresh(None, None)
+    assert checker.refresh_task is None
+
+    stopped_calls = calls
+    await asyncio.sleep(0.1)
+    assert calls == stopped_calls
+
+
+@pytest.mark.asyncio
+async def test_run_background_hung_check():
+    calls = 0
+
+    async def hung():
+        await asyncio.sleep(10)
+        return True, ''
+
+    def check1():
+        nonlocal calls
+        calls += 1
+        return True, ''
+
+    checker = HealthCheck(
+        checks=[Check(hung, success_ttl=0.05), Check(check1, success_ttl=0.05)],
+        background=True,
+    )
+
+    await checker.start_refresh(None, asyncio.get_event_loop())
+    await asyncio.sleep(0.3)
+
+    # The hung check does not hold back the refresh of the other check.
+    assert calls >= 3
+    assert checker.checks[0] not in checker.cache
+
+    await checker.stop_refresh(None, None)
+
+
+@pytest.mark.asyncio
+async def test_run_background_stale():
+
+    def check1():
+        return True, ''
+
+    checker = HealthCheck(
+        checks=[check1],
+        failure_handler=json_failure_handler,
+        background=True,
+        stale_ttl=5,
+    )
+
+    resp = await checker.run(None)
+    assert resp.status == 200
+
+    # A result which has not been refreshed long after it expired is reported as failed.
+    checker.cache[checker.checks[0]]['expires'] = time.time() - 10
+    resp = await checker.run(None)
+    assert resp.status == 500
+    assert 'Stale: not refreshed for' in resp.body.decode()
+
+    resp = await checker.run(None, status_only=True)
+    assert resp.status == 500
+
+
+@pytest.mark.asyncio
+async def test_run_background_not_started():
+
+    def check1():
+        return False, ''
+
+    checker = HealthCheck(
+        checks=[check1],
+        background=True,
+    )
+
+    resp = await checker.run(None)
+
+    assert resp.status == 500
+    assert len(checker.cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_run_single_flight():
+    calls = 0
+
+    async def check1():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return True, ''
+
+    checker = HealthCheck(
+        checks=[check1],
+        concurrent=True,
+    )
+
+    responses = await asyncio.gather(*(checker.run(None) for _ in range(5)))
+
+    assert [r.status for r in responses] == [200] * 5
+    assert calls == 1
+    assert len(checker.cache) == 1
+    assert checker._inflight == {}
+
+
+@pytest.mark.asyncio
+async def test_run_single_flight_caller_cancelled():
+    calls = 0
+
+    async def check1():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return True, ''
+
+    checker = HealthCheck(checks=[check1])
+
+    first = asyncio.ensure_future(checker.run(None))
+    await asyncio.sleep(0)
+    second = asyncio.ensure_future(checker.run(None))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    resp = await second
+    assert resp.status == 200
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_run_stale_while_revalidate():
+    calls = 0
+
+    async def check1():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return calls == 1, ''
+
+    checker = HealthCheck(
+        checks=[check1],
+        stale_ttl=10,
+    )
+
+    resp = await checker.run(None)
+    assert resp.status == 200
+    assert calls == 1
+
+    # An expired result within the stale window is served immediately,
+    # while the check is re-run in the background.
+    checker.cache[checker.checks[0]]['expires'] = time.time() - 1
+    resp = await checker.run(None)
+    assert resp.status == 200
+    assert checker.checks[0] in checker._inflight
+
+    await asyncio.sleep(0.05)
+    resp = await checker.run(None)
+    assert resp.status == 500
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_run_stale_too_old():
+    calls = 0
+
+    def check1():
+        nonlocal calls
+        calls += 1
+        return calls == 1, ''
+
+    checker = HealthCheck(
+        checks=[check1],
+        stale_ttl=1,
+    )
+
+    resp = await checker.run(None)
+    assert resp.status == 200
+
+    checker.cache[checker.checks[0]]['expires'] = time.time() - 2
+    resp = await checker.run(None)
+    assert resp.status == 500
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_run_check_ttl():
+
+    def check1():
+        return True, ''
+
+    def check2():
+        return False, ''
+
+    checker = HealthCheck(
+        checks=[Check(check1, success_ttl=100), Check(check2, failure_ttl=50)],
+    )
+
+    resp = await checker.run(None)
+    assert resp.status == 500
+
+    c1, c2 = checker.checks
+    assert checker.cache[c1]['expires'] - checker.cache[c1]['timestamp'] == pytest.approx(100)
+    assert checker.cache[c2]['expires'] - checker.cache[c2]['timestamp'] == pytest.approx(50)
+
+
+@pytest.mark.asyncio
+async def test_run_cache_response():
+    calls = 0
+
+    def check1():
+        return True, ''
+
+    def handler(results):
+        nonlocal calls
+        calls += 1
+        return f'handler called {calls}'
+
+    checker = HealthCheck(
+        checks=[check1],
+        success_handler=handler,
+        success_headers={'foo': 'bar'},
+        cache_response=True,
+    )
+
+    # The first run executes the check, so the response is not cached.
+    resp = await checker.run(None)
+    assert resp.body.decode() == 'handler called 1'
+
+    resp = await checker.run(None)
+    assert resp.body.decode() == 'handler called 2'
+
+    resp = await checker.run(None)
+    assert resp.status == 200
+    assert resp.headers == {'foo': 'bar'}
+    assert resp.body.decode() == 'handler called 2'
+    assert calls == 2
+
+    # Once a result changes, the response is rendered again.
+    checker.cache[checker.checks[0]]['expires'] = 0
+    resp = await checker.run(None)
+    assert resp.body.decode() == 'handler called 3'
+
+
+@pytest.mark.asyncio
+async def test_run_no_cache_response():
+    calls = 0
+
+    def check1():
+        return True, ''
+
+    def handler(results):
+        nonlocal calls
+        calls += 1
+        return 'handler called'
+
+    checker = HealthCheck(
+        checks=[check1],
+        success_handler=handler,
+    )
+
+    for _ in range(3):
+        await checker.run(None)
+
+    assert calls == 3
+
+
+@pytest.mark.asyncio
+async def test_run_cache_response_uncached_result():
+    hang = False
+
+    async def check1():
+        if hang:
+            await asyncio.sleep(10)
+        return True, ''
+
+    checker = HealthCheck(
+        checks=[check1],
+        cache_response=True,
+        etag=True,
+        deadline=0.2,
+        stale_ttl=0.2,
+    )
+
+    await checker.run(None)
+    resp = await checker.run(None)
+    assert resp.status == 200
+    etag = resp.headers['ETag']
+
+    # The revalidation hangs past the stale window, so the check times out.
+    # The timed out result is never cached, so the cached response (and its
+    # ETag) must not be reused for it.
+    hang = True
+    checker.cache[checker.checks[0]]['expires'] = time.time() - 1
+    resp = await checker.run(Request(headers={'If-None-Match': etag}))
+    assert resp.status == 500
+    assert resp.headers['ETag'] != etag
+
+    for future in list(checker._inflight.values()):
+        future.cancel()
+
+
+@pytest.mark.asyncio
+async def test_run_result_provenance():
+    results = []
+
+    def check1():
+        return True, ''
+
+    def handler(r):
+        results.append(r)
+        return json_success_handler(r)
+
+    checker = HealthCheck(
+        checks=[check1],
+        success_handler=handler,
+        success_ttl=30,
+    )
+
+    resp = await checker.run(None)
+    fresh = json.loads(resp.body)['results'][0]
+    assert fresh['cached'] is False
+    assert fresh['age'] == 0
+    assert fresh['duration'] >= 0
+    assert fresh['expires'] == pytest.approx(fresh['timestamp'] + 30)
+
+    resp = await checker.run(None)
+    cached = json.loads(resp.body)['results'][0]
+    assert cached['cached'] is True
+    assert cached['age'] >= 0
+    assert cached['duration'] == fresh['duration']
+    assert cached['expires'] == fresh['expires']
+
+    # Serving a cached result does not modify the cache entry.
+    assert checker.cache[checker.checks[0]]['cached'] is False
+
+
+@pytest.mark.asyncio
+async def test_run_fail_fast():
+    results = []
+
+    async def slow():
+        await asyncio.sleep(0.5)
+        return True, ''
+
+    def critical():
+        return False, 'down'
+
+    def handler(r):
+        results.extend(r)
+        return 'handler called'
+
+    checker = HealthCheck(
+        checks=[slow, Check(critical, critical=True)],
+        concurrent=True,
+        fail_fast=True,
+        failure_handler=handler,
+    )
+
+    start = time.monotonic()
+    resp = await checker.run(None)
+
+    assert time.monotonic() - start < 0.25
+    assert resp.status == 500
+    assert results[0]['cancelled'] is True
+    assert results[1]['message'] == 'down'
+
+    # No other caller was waiting for the check, so its execution is cancelled.
+    await asyncio.sleep(0.6)
+    assert checker.checks[0] not in checker.cache
+    assert checker._inflight == {}
+    assert checker._waiters == {}
+
+
+@pytest.mark.asyncio
+async def test_run_fail_fast_shared_execution():
+    results = []
+
+    async def slow():
+        await asyncio.sleep(0.2)
+        return True, ''
+
+    def critical():
+        return False, 'down'
+
+    checker = HealthCheck(
+        checks=[slow, Check(critical, critical=True)],
+        concurrent=True,
+        fail_fast=True,
+        failure_handler=lambda r: results.extend(r) or '',
+    )
+    check = checker.checks[0]
+
+    # Another caller is waiting for the same execution of the slow check, so
+    # cancelling the request does not cancel the execution.
+    other = asyncio.ensure_future(checker._refresh_check(check))
+    await asyncio.sleep(0)
+
+    resp = await checker.run(None)
+
+    assert resp.status == 500
+    assert results[0]['cancelled'] is True
+    assert (await other)['passed'] is True
+    assert checker.cache[check]['passed'] is True
+
+
+@pytest.mark.asyncio
+async def test_run_selected_checks():
+    calls = []
+
+    def db():
+        calls.append('db')
+        return False, ''
+
+    def cache():
+        calls.append('cache')
+        return True, ''
+
+    checker = HealthCheck(
+        checks=[db, Check(cache, tags=['fast'])],
+        cache_response=True,
+    )
+
+    request = Request(tag='fast')
+
+    resp = await checker.run(request)
+    assert resp.status == 200
+    assert calls == ['cache']
+    assert len(checker.cache) == 1
+
+    # The cached response for the selection is not used for other selections.
+    resp = await checker.run(request)
+    assert resp.status == 200
+    resp = await checker.run(None)
+    assert resp.status == 500
+    assert calls == ['cache', 'db']
+
+
+@pytest.mark.asyncio
+async def test_run_status_only():
+    calls = []
+
+    def check1():
+        return True, 'test message'
+
+    def handler(results):
+        calls.append(results)
+        return 'handler called'
+
+    checker = HealthCheck(
+        checks=[check1],
+        success_handler=handler,
+        failure_handler=handler,
+        success_headers={'foo': 'bar'},
+    )
+
+    resp = await checker.run(Request(method='HEAD'))
+
+    assert resp.status == 200
+    assert resp.headers == {'foo': 'bar'}
+    assert not resp.body
+    assert calls == []
+
+    resp = await checker.run_status(None)
+
+    assert resp.status == 200
+    assert not resp.body
+    assert calls == []
+
+    # Cached results are not copied for a status-only response.
+    cached = checker.cache[checker.checks[0]]
+    assert await checker._run_check_status(checker.checks[0]) is cached
+    assert await checker._run_check(checker.checks[0]) is not cached
+
+    checker.cache[checker.checks[0]] = dict(cached, passed=False)
+    resp = await checker.run(None, status_only=True)
+
+    assert resp.status == 500
+    assert not resp.body
+    assert calls == []
+
+
+@pytest.mark.asyncio
+async def test_run_check_inflight_caller_deadline():
+    calls = []
+
+    async def check1():
+        calls.append(None)
+        await asyncio.sleep(0.3)
+        return True, 'test message'
+
+    checker = HealthCheck(checks=[check1], deadline=0.05)
+    check = checker.checks[0]
+
+    # Start an execution with no deadline, as a stale-while-revalidate refresh does.
+    inflight = checker._get_inflight(check)
+    await asyncio.sleep(0)
+
+    start = time.monotonic()
+    results = await checker.run_checks(checker.checks, checker._run_check)
+
+    assert time.monotonic() - start < 0.2
+    assert results[0]['passed'] is False
+    assert results[0]['message'] == MSG_DEADLINE
+    assert check not in checker.cache
+
+    # The shared execution keeps running, and caches its result.
+    result = await inflight
+    assert result['passed'] is True
+    assert checker.cache[check]['passed'] is True
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_run_check_inflight_caller_timeout():
+
+    async def check1():
+        await asyncio.sleep(0.3)
+        return True, 'test message'
+
+    checker = HealthCheck(checks=[Check(check1, timeout=0.05)])
+    check = checker.checks[0]
+
+    inflight = checker._get_inflight(check)
+    result = await checker._run_check(check)
+
+    assert result['passed'] is False
+    assert result['message'] == MSG_TIMEOUT.format(0.05)
+    assert (await inflight)['passed'] is False
+
+
+@pytest.mark.asyncio
+async def test_run_unregistered_check_function():
+    calls = []
+
+    def check1():
+        calls.append(None)
+        return True, 'test message'
+
+    checker = HealthCheck()
+    checker.checks.append(check1)
+
+    for _ in range(3):
+        resp = await checker.run(None)
+        assert resp.status == 200
+
+    assert len(calls) == 1
+    assert len(checker.cache) == 1
+    assert checker.get_check(check1) is checker.get_check(check1)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('upstream_passes', [True, False])
+async def test_run_background_dependencies(caplog, upstream_passes):
+    calls = {'a': 0, 'b': 0}
+
+    def a():
+        calls['a'] += 1
+        return upstream_passes, ''
+
+    def b():
+        calls['b'] += 1
+        return True, ''
+
+    checker = HealthCheck(
+        checks=[Check(a, success_ttl=100, failure_ttl=100), Check(b, success_ttl=0.05, failure_ttl=0.05, depends_on=['a'])],
+        background=True,
+    )
+
+    await checker.start_refresh(None, asyncio.get_event_loop())
+    await asyncio.sleep(0.3)
+    await checker.stop_refresh(None, None)
+
+    assert 'Unexpected error' not in caplog.text
+    assert calls['a'] == 1
+    if upstream_passes:
+        assert calls['b'] >= 3
+    else:
+        # The skipped result is cached, so the check is not due again right away.
+        assert calls['b'] == 0
+        assert checker.cache[checker.checks[1]]['skipped'] is True
+        assert caplog.text.count('skipped') <= 10
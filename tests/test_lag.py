@@ -0,0 +1,67 @@
+
+import asyncio
+import time
+
+import pytest
+
+from sanic_healthcheck import HealthCheck, LoopLagCheck
+from sanic_healthcheck.checker import MSG_OK
+from tests import App
+
+
+def test_init_registers_listeners():
+    app = App()
+    check = LoopLagCheck()
+    HealthCheck(app=app).add_check(check)
+    check.init(app)
+
+    assert app.listeners == [
+        (check.start_monitor, 'after_server_start'),
+        (check.stop_monitor, 'before_server_stop'),
+    ]
+
+
+def test_check_no_samples():
+    check = LoopLagCheck()
+
+    assert check.lag() == 0.0
+    assert check() == (True, MSG_OK)
+
+
+@pytest.mark.asyncio
+async def test_monitor_records_lag():
+    check = LoopLagCheck(interval=0.01, max_lag=0.05)
+    check.start()
+    try:
+        await asyncio.sleep(0.05)
+        assert len(check.samples) > 0
+        assert check() == (True, MSG_OK)
+
+        # Block the event loop.
+        time.sleep(0.1)
+        passed, msg = check()
+        assert passed is False
+        assert msg.startswith('p99 event loop lag')
+
+        await asyncio.sleep(0.02)
+        assert max(check.samples.values()) >= 0.08
+        assert check()[0] is False
+    finally:
+        check.stop()
+
+    assert check._handle is None
+
+
+@pytest.mark.asyncio
+async def test_monitor_listeners():
+    check = LoopLagCheck(interval=0.01)
+
+    await check.start_monitor(None, asyncio.get_event_loop())
+    await asyncio.sleep(0.03)
+    await check.stop_monitor(None, None)
+
+    count = len(check.samples)
+    assert count > 0
+
+    await asyncio.sleep(0.03)
+    assert len(check.samples) == count
@@ -0,0 +1,123 @@
+
+import asyncio
+
+import pytest
+
+from sanic_healthcheck import HealthCheck, Metrics, ReadyCheck
+from sanic_healthcheck.metrics import CONTENT_TYPE_PROMETHEUS
+
+
+def test_observe():
+    metrics = Metrics(buckets=[0.1, 1])
+
+    metrics.observe('HealthCheck', 'db', 0.05, True)
+    metrics.observe('HealthCheck', 'db', 0.1, False)
+    metrics.observe('HealthCheck', 'db', 5, False, timed_out=True)
+
+    rendered = metrics.render()
+    labels = 'checker="HealthCheck",check="db"'
+
+    assert f'sanic_healthcheck_check_duration_seconds_bucket{{{labels},le="0.1"}} 2' in rendered
+    assert f'sanic_healthcheck_check_duration_seconds_bucket{{{labels},le="1.0"}} 2' in rendered
+    assert f'sanic_healthcheck_check_duration_seconds_bucket{{{labels},le="+Inf"}} 3' in rendered
+    assert f'sanic_healthcheck_check_duration_seconds_sum{{{labels}}} 5.15' in rendered
+    assert f'sanic_healthcheck_check_duration_seconds_count{{{labels}}} 3' in rendered
+    assert f'sanic_healthcheck_check_passed_total{{{labels}}} 1' in rendered
+    assert f'sanic_healthcheck_check_failed_total{{{labels}}} 2' in rendered
+    assert f'sanic_healthcheck_check_timeouts_total{{{labels}}} 1' in rendered
+
+
+def test_observe_preallocated():
+    metrics = Metrics()
+
+    metrics.observe('HealthCheck', 'db', 0.05, True)
+    series = metrics._series[('HealthCheck', 'db')]
+    buckets = series.buckets
+
+    for _ in range(100):
+        metrics.observe('HealthCheck', 'db', 0.05, True)
+
+    assert len(metrics._series) == 1
+    assert metrics._series[('HealthCheck', 'db')] is series
+    assert series.buckets is buckets
+    assert series.count == 101
+
+
+def test_render_escapes_labels():
+    metrics = Metrics()
+
+    metrics.cache_hit('HealthCheck', 'a "quoted"\\check\n')
+
+    rendered = metrics.render()
+    assert 'check="a \\"quoted\\"\\\\check\\n"' in rendered
+
+
+def test_render_empty():
+    metrics = Metrics()
+
+    rendered = metrics.render()
+    assert '# TYPE sanic_healthcheck_check_duration_seconds histogram' in rendered
+    assert rendered.endswith('\n')
+
+
+@pytest.mark.asyncio
+async def test_export():
+    metrics = Metrics()
+    metrics.observe('ReadyCheck', 'db', 0.05, True)
+
+    resp = await metrics.export(None)
+
+    assert resp.status == 200
+    assert resp.content_type == CONTENT_TYPE_PROMETHEUS
+    assert b'sanic_healthcheck_check_passed_total' in resp.body
+
+
+@pytest.mark.asyncio
+async def test_health_check_metrics():
+    metrics = Metrics()
+
+    def check1():
+        return True, ''
+
+    async def check2():
+        await asyncio.sleep(1)
+        return True, ''
+
+    checker = HealthCheck(
+        checks=[check1, check2],
+        timeout=0.01,
+        metrics=metrics,
+    )
+
+    await checker.run(None)
+    await checker.run(None)
+
+    one = metrics._series[('HealthCheck', 'check1')]
+    assert one.count == 1
+    assert one.passed == 1
+    assert one.cache_misses == 1
+    assert one.cache_hits == 1
+
+    two = metrics._series[('HealthCheck', 'check2')]
+    assert two.count == 1
+    assert two.failed == 1
+    assert two.timeouts == 1
+
+
+@pytest.mark.asyncio
+async def test_ready_check_metrics():
+    metrics = Metrics()
+
+    def check1():
+        return False, ''
+
+    checker = ReadyCheck(checks=[check1], metrics=metrics)
+
+    await checker.run(None)
+    await checker.run(None)
+
+    one = metrics._series[('ReadyCheck', 'check1')]
+    assert one.count == 2
+    assert one.failed == 2
+    assert one.cache_hits == 0
+    assert one.cache_misses == 0
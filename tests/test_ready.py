@@ -3,6 +3,7 @@ import pytest
 
 from sanic_healthcheck import ReadyCheck
 from sanic_healthcheck.checker import MSG_FAIL, MSG_OK
+from tests import Request
 
 
 @pytest.mark.asyncio
@@ -93,3 +94,148 @@ async def test_run_custom_failure_data():
     assert resp.status == 501
     assert resp.headers == {'foo': 'bar'}
     assert resp.body.decode() == 'handler called'
+
+
+@pytest.mark.asyncio
+async def test_run_checks_concurrent():
+
+    def check1():
+        return True, ''
+
+    async def check2():
+        return False, ''
+
+    results = []
+
+    def handler(r):
+        results.extend(r)
+        return 'handler called'
+
+    checker = ReadyCheck(
+        checks=[check1, check2, check1],
+        concurrent=True,
+        failure_handler=handler,
+    )
+
+    resp = await checker.run(None)
+
+    assert resp.status == 500
+    assert resp.body.decode() == 'handler called'
+    assert [r['check'] for r in results] == ['check1', 'check2', 'check1']
+
+
+@pytest.mark.asyncio
+async def test_run_bytes_handler():
+
+    def check1():
+        return True, ''
+
+    checker = ReadyCheck(
+        checks=[check1],
+        success_handler=lambda results: b'handler called',
+    )
+
+    resp = await checker.run(None)
+
+    assert resp.status == 200
+    assert resp.body == b'handler called'
+
+
+@pytest.mark.asyncio
+async def test_run_conditions():
+    results = []
+
+    def handler(r):
+        results[:] = r
+        return 'handler called'
+
+    checker = ReadyCheck(
+        success_handler=handler,
+        failure_handler=handler,
+    )
+
+    checker.set_condition('consumer', False, 'not connected')
+    resp = await checker.run(None)
+
+    assert resp.status == 500
+    assert len(results) == 1
+    assert results[0]['check'] == 'consumer'
+    assert results[0]['passed'] is False
+    assert results[0]['message'] == 'not connected'
+    assert results[0]['condition'] is True
+
+    checker.set_condition('consumer', True, 'connected')
+    resp = await checker.run(None)
+
+    assert resp.status == 200
+    assert results[0]['message'] == 'connected'
+
+    checker.clear_condition('consumer')
+    checker.clear_condition('unknown')
+    resp = await checker.run(None)
+
+    assert resp.status == 200
+    assert results == []
+
+
+@pytest.mark.asyncio
+async def test_run_conditions_with_checks():
+    calls = []
+    results = []
+
+    def check1():
+        calls.append('check1')
+        return True, ''
+
+    def handler(r):
+        results[:] = r
+        return 'handler called'
+
+    checker = ReadyCheck(
+        checks=[check1],
+        success_handler=handler,
+        failure_handler=handler,
+    )
+    checker.set_condition('cache', True)
+
+    resp = await checker.run(None)
+
+    assert resp.status == 200
+    assert calls == ['check1']
+    assert [r['check'] for r in results] == ['check1', 'cache']
+
+    # Selecting only a condition does not run any checks.
+    resp = await checker.run(Request(check='cache'))
+
+    assert resp.status == 200
+    assert calls == ['check1']
+    assert [r['check'] for r in results] == ['cache']
+
+    resp = await checker.run(Request(check='check1'))
+
+    assert resp.status == 200
+    assert calls == ['check1', 'check1']
+    assert [r['check'] for r in results] == ['check1']
+
+
+@pytest.mark.asyncio
+async def test_run_status_only():
+
+    def check1():
+        return True, ''
+
+    checker = ReadyCheck(
+        checks=[check1],
+        success_handler=lambda results: 'handler called',
+    )
+
+    resp = await checker.run(Request(method='HEAD'))
+
+    assert resp.status == 200
+    assert not resp.body
+
+    checker.set_condition('consumer', False)
+    resp = await checker.run_status(None)
+
+    assert resp.status == 500
+    assert not resp.body
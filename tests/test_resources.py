@@ -0,0 +1,107 @@
+
+import threading
+import time
+
+import pytest
+
+from sanic_healthcheck import HealthCheck, resources
+
+
+def test_cached_value():
+    calls = []
+
+    def read():
+        calls.append(None)
+        return len(calls)
+
+    cached = resources._Cached(read, 0.05)
+
+    assert cached() == 1
+    assert cached() == 1
+    time.sleep(0.06)
+    assert cached() == 2
+
+
+def test_read_values():
+    assert resources.read_rss() > 0
+    assert resources.read_open_fds() > 0
+
+    event = threading.Event()
+    thread = threading.Thread(target=event.wait)
+    thread.start()
+    try:
+        assert resources.read_thread_count() >= 2
+    finally:
+        event.set()
+        thread.join()
+
+
+def test_rss_check():
+    passed, msg = resources.rss_check(max_rss=1024 ** 4)()
+    assert passed is True
+    assert msg.startswith('RSS ')
+
+    passed, msg = resources.rss_check(max_rss=1024)()
+    assert passed is False
+    assert msg.endswith('exceeds 1.0 KiB')
+
+
+def test_open_fds_check():
+    assert resources.open_fds_check()()[0] is True
+
+    passed, msg = resources.open_fds_check(max_fds=0)()
+    assert passed is False
+    assert msg.endswith('open file descriptors exceeds 0')
+
+    passed, msg = resources.open_fds_check(max_fraction=0)()
+    assert passed is False
+    assert 'of the limit of' in msg
+
+
+def test_disk_space_check():
+    assert resources.disk_space_check('/', min_free_fraction=0)()[0] is True
+
+    passed, msg = resources.disk_space_check('/', min_free=1024 ** 5)()
+    assert passed is False
+    assert msg.endswith('below 1024.0 TiB')
+
+    passed, msg = resources.disk_space_check('/', min_free_fraction=1.1)()
+    assert passed is False
+    assert msg.endswith('below 110.0%')
+
+
+def test_thread_count_check():
+    assert resources.thread_count_check(max_threads=10000)()[0] is True
+
+    passed, msg = resources.thread_count_check(max_threads=0)()
+    assert passed is False
+    assert msg.endswith('threads exceeds 0')
+
+
+@pytest.mark.asyncio
+async def test_run_with_checker():
+    results = []
+
+    def handler(r):
+        results.extend(r)
+        return ''
+
+    checker = HealthCheck(
+        checks=[resources.rss_check(max_rss=1024 ** 4), resources.thread_count_check(max_threads=0)],
+        failure_handler=handler,
+    )
+
+    resp = await checker.run(None)
+
+    assert resp.status == 500
+    assert [(r['check'], r['passed']) for r in results] == [('rss', True), ('threads', False)]
+
+
+@pytest.mark.parametrize('value,expected', [
+    (0, '0 B'),
+    (1023, '1023 B'),
+    (1536, '1.5 KiB'),
+    (5 * 1024 ** 3, '5.0 GiB'),
+])
+def test_format_bytes(value, expected):
+    assert resources._format_bytes(value) == expected
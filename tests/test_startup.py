@@ -0,0 +1,113 @@
+
+import pytest
+
+from sanic_healthcheck import StartupCheck
+from sanic_healthcheck.checker import MSG_FAIL, MSG_OK
+from tests import Request
+
+
+@pytest.mark.asyncio
+async def test_run_no_checks():
+    checker = StartupCheck()
+
+    resp = await checker.run(None)
+
+    assert resp.status == 200
+    assert resp.headers == {}
+    assert resp.body.decode() == MSG_OK
+    assert checker.started is True
+
+
+@pytest.mark.asyncio
+async def test_run_latches():
+    calls = 0
+    handled = 0
+
+    def check1():
+        nonlocal calls
+        calls += 1
+        return calls >= 2, ''
+
+    def handler(results):
+        nonlocal handled
+        handled += 1
+        return 'handler called'
+
+    checker = StartupCheck(
+        checks=[check1],
+        success_handler=handler,
+        success_headers={'foo': 'bar'},
+    )
+
+    resp = await checker.run(None)
+    assert resp.status == 500
+    assert resp.body.decode() == MSG_FAIL
+    assert checker.started is False
+
+    resp = await checker.run(None)
+    assert resp.status == 200
+    assert resp.body.decode() == 'handler called'
+    assert checker.started is True
+
+    # Once started, checks are no longer run and the response is reused.
+    for _ in range(3):
+        resp = await checker.run(None)
+        assert resp.status == 200
+        assert resp.headers == {'foo': 'bar'}
+        assert resp.body.decode() == 'handler called'
+
+    assert calls == 2
+    assert handled == 1
+
+
+@pytest.mark.asyncio
+async def test_run_selected_does_not_latch():
+
+    def check1():
+        return True, ''
+
+    def check2():
+        return False, ''
+
+    checker = StartupCheck(checks=[check1, check2])
+
+    resp = await checker.run(Request(check='check1'))
+    assert resp.status == 200
+    assert checker.started is False
+
+    resp = await checker.run(None)
+    assert resp.status == 500
+    assert checker.started is False
+
+
+@pytest.mark.asyncio
+async def test_run_status_only():
+    calls = []
+
+    def check1():
+        calls.append(None)
+        return len(calls) > 1, ''
+
+    checker = StartupCheck(checks=[check1])
+
+    resp = await checker.run(Request(method='HEAD'))
+
+    assert resp.status == 500
+    assert not resp.body
+    assert checker.started is False
+
+    resp = await checker.run_status(None)
+
+    assert resp.status == 200
+    assert not resp.body
+    assert checker.started is True
+
+    resp = await checker.run_status(None)
+
+    assert resp.status == 200
+    assert len(calls) == 2
+
+    resp = await checker.run(None)
+
+    assert resp.status == 200
+    assert resp.body.decode() == MSG_OK
@@ -0,0 +1,232 @@
+
+import asyncio
+import multiprocessing
+import time
+
+import pytest
+
+from sanic_healthcheck import HealthCheck
+from sanic_healthcheck.store import SharedResultStore
+
+
+@pytest.fixture()
+def store_path(tmp_path):
+    return str(tmp_path / 'store')
+
+
+def test_get_missing(store_path):
+    store = SharedResultStore(store_path)
+
+    assert store.get('foo') is None
+
+
+def test_put_get(store_path):
+    store = SharedResultStore(store_path)
+    result = {'check': 'foo', 'message': 'ok', 'passed': True, 'timestamp': 1.0, 'expires': 2.0}
+
+    store.put('foo', result)
+    assert store.get('foo') == result
+
+    # Another store for the same file sees the result.
+    other = SharedResultStore(store_path)
+    assert other.get('foo') == result
+    assert other.get('bar') is None
+
+
+def test_put_too_large(store_path):
+    store = SharedResultStore(store_path, slot_size=256)
+
+    store.put('foo', {'message': 'x' * 1024})
+    assert store.get('foo') is None
+
+
+def test_slot_collisions(store_path):
+    store = SharedResultStore(store_path, slots=4)
+
+    for i in range(4):
+        store.put(f'check-{i}', {'i': i})
+
+    for i in range(4):
+        assert store.get(f'check-{i}') == {'i': i}
+
+    # The store is full.
+    store.put('check-4', {'i': 4})
+    assert store.get('check-4') is None
+
+
+def test_lease(store_path):
+    store = SharedResultStore(store_path)
+    other = SharedResultStore(store_path)
+
+    assert store.acquire('foo') is True
+    assert other.acquire('foo') is False
+
+    store.put('foo', {'passed': True})
+    assert other.acquire('foo') is True
+
+    other.release('foo')
+    assert store.acquire('foo') is True
+    assert store.lease_expires('foo') == pytest.approx(time.time() + 30, abs=1)
+    assert store.lease_expires('bar') == 0.0
+
+
+def test_put_keeps_lease(store_path):
+    store = SharedResultStore(store_path)
+    other = SharedResultStore(store_path)
+
+    # A worker storing a result does not release another worker's lease.
+    assert store.acquire('foo') is True
+    other.put('foo', {'passed': True})
+    other.release('foo')
+    assert other.acquire('foo') is False
+
+    store.put('foo', {'passed': True})
+    assert other.acquire('foo') is True
+
+
+def _acquire(path, barrier, results):
+    store = SharedResultStore(path)
+    barrier.wait()
+    results.put(store.acquire('foo'))
+
+
+def test_lease_processes(store_path):
+    ctx = multiprocessing.get_context('fork')
+    barrier = ctx.Barrier(8)
+    results = ctx.Queue()
+
+    SharedResultStore(store_path).get('foo')
+    processes = [ctx.Process(target=_acquire, args=(store_path, barrier, results)) for _ in range(8)]
+    for process in processes:
+        process.start()
+    acquired = [results.get(timeout=10) for _ in processes]
+    for process in processes:
+        process.join()
+
+    # Only one of the processes competing for the lease acquires it.
+    assert sorted(acquired) == [False] * 7 + [True]
+
+
+def test_lease_expires(store_path):
+    store = SharedResultStore(store_path, lease_ttl=-1)
+    other = SharedResultStore(store_path)
+
+    assert store.acquire('foo') is True
+    assert other.acquire('foo') is True
+
+
+def test_layout_mismatch(store_path):
+    store = SharedResultStore(store_path, slots=8)
+    store.put('foo', {'passed': True})
+    store.close()
+
+    # The file is not re-initialized, since other workers may have it mapped.
+    store = SharedResultStore(store_path, slots=16)
+    with pytest.raises(ValueError):
+        store.get('foo')
+
+    store = SharedResultStore(store_path, slots=8)
+    assert store.get('foo') == {'passed': True}
+
+
+@pytest.mark.asyncio
+async def test_health_check_shared(store_path):
+    calls = 0
+
+    def check1():
+        nonlocal calls
+        calls += 1
+        return True, 'ok'
+
+    workers = [HealthCheck(checks=[check1], store=SharedResultStore(store_path)) for _ in range(3)]
+
+    for checker in workers:
+        resp = await checker.run(None)
+        assert resp.status == 200
+
+    assert calls == 1
+    assert all(len(checker.cache) == 1 for checker in workers)
+
+
+@pytest.mark.asyncio
+async def test_health_check_shared_lease_held(store_path):
+    calls = 0
+
+    def check1():
+        nonlocal calls
+        calls += 1
+        return False, 'failed'
+
+    first = HealthCheck(checks=[check1], store=SharedResultStore(store_path))
+    second = HealthCheck(checks=[check1], store=SharedResultStore(store_path))
+
+    resp = await first.run(None)
+    assert resp.status == 500
+    assert calls == 1
+
+    # The stored result has expired, but another worker holds the lease to
+    # refresh it, so the latest stored result is used.
+    stored = first.store.get('check1')
+    stored['expires'] = 0
+    first.store.put('check1', stored)
+    assert first.store.acquire('check1')
+
+    resp = await second.run(None)
+    assert resp.status == 500
+    assert calls == 1
+
+    # The expired result is used locally until the lease expires, rather than
+    # the store being checked again on every request.
+    cached = second.cache[second.checks[0]]
+    assert time.time() < cached['expires'] <= time.time() + 1
+    generation = second.generation
+
+    first.store.put('check1', stored)
+    assert first.store.acquire('check1')
+    await second._exec_and_cache(second.checks[0])
+
+    assert calls == 1
+    assert second.generation == generation
+
+
+@pytest.mark.asyncio
+async def test_health_check_shared_wait(store_path):
+    calls = 0
+
+    def check1():
+        nonlocal calls
+        calls += 1
+        return True, 'ok'
+
+    first = HealthCheck(checks=[check1], store=SharedResultStore(store_path))
+    second = HealthCheck(checks=[check1], store=SharedResultStore(store_path))
+
+    # Another worker holds the lease and there is no stored result yet, so the
+    # check is not run; its result is awaited instead.
+    assert first.store.acquire('check1')
+    task = asyncio.ensure_future(second.run(None))
+    await asyncio.sleep(0.1)
+    assert not task.done()
+
+    await first.run(None)
+    resp = await task
+    assert resp.status == 200
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_health_check_shared_wait_timeout(store_path):
+    calls = 0
+
+    def check1():
+        nonlocal calls
+        calls += 1
+        return True, 'ok'
+
+    first = SharedResultStore(store_path)
+    second = HealthCheck(checks=[check1], store=SharedResultStore(store_path), timeout=0.1)
+
+    assert first.acquire('check1')
+    resp = await second.run(None)
+    assert resp.status == 500
+    assert calls == 0
@@ -0,0 +1,156 @@
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from sanic_healthcheck import HealthCheck, ReadyCheck, TrafficCheck
+from sanic_healthcheck.checker import MSG_OK
+from sanic_healthcheck.traffic import UNMATCHED_ROUTE
+from tests import App
+
+
+def make_request(path, uri_template=None):
+    return SimpleNamespace(path=path, uri_template=uri_template, ctx=SimpleNamespace())
+
+
+def test_init_registers_middleware_once():
+    app = App()
+    check = TrafficCheck()
+
+    HealthCheck(app=app, checks=[check])
+    ReadyCheck(app=app).add_check(check)
+
+    assert app.middleware == [
+        (check.on_request, 'request'),
+        (check.on_response, 'response'),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_middleware_records_requests():
+    check = TrafficCheck()
+
+    request = make_request('/users/1', '/users/<id>')
+    await check.on_request(request)
+    await check.on_response(request, SimpleNamespace(status=503))
+
+    # Requests which match no route are recorded together.
+    for path in ('/about', '/wp-admin'):
+        request = make_request(path)
+        await check.on_request(request)
+        await check.on_response(request, SimpleNamespace(status=404))
+
+    stats = check.stats()
+    assert set(stats) == {'/users/<id>', UNMATCHED_ROUTE}
+    assert stats['/users/<id>'][:2] == (1, 1.0)
+    assert stats[UNMATCHED_ROUTE][:2] == (2, 0.0)
+
+
+@pytest.mark.asyncio
+async def test_middleware_without_request_start():
+    check = TrafficCheck()
+
+    await check.on_response(make_request('/'), SimpleNamespace(status=500))
+
+    assert check.routes == {}
+
+
+def test_check_error_rate():
+    check = TrafficCheck(max_error_rate=0.1, min_samples=10)
+
+    for i in range(10):
+        check.record('/', 0.01, i < 2)
+    # Routes with too few samples are not checked.
+    check.record('/rare', 0.01, True)
+
+    passed, msg = check()
+    assert passed is False
+    assert msg == '/: error rate 20.0% > 10.0%'
+
+
+def test_check_latency():
+    check = TrafficCheck(max_error_rate=None, max_latency=0.5, percentile=90, min_samples=1)
+
+    for i in range(10):
+        check.record('/', 0.1 * (i + 1), False)
+
+    passed, msg = check()
+    assert passed is False
+    assert msg == '/: p90 latency 0.9s > 0.5s'
+
+    check.max_latency = 1
+    assert check() == (True, MSG_OK)
+
+
+def test_check_window():
+    check = TrafficCheck(window=5, min_samples=1)
+
+    for _ in range(5):
+        check.record('/', 0.01, True)
+    assert check()[0] is False
+
+    # Errors leave the window as newer requests are recorded.
+    for _ in range(5):
+        check.record('/', 0.01, False)
+    assert check() == (True, MSG_OK)
+
+
+def test_check_max_age():
+    check = TrafficCheck(max_age=0.05, min_samples=1)
+
+    check.record('/', 0.01, True)
+    assert check()[0] is False
+
+    time.sleep(0.06)
+    assert check() == (True, MSG_OK)
+    assert check.stats() == {}
+    assert check.routes == {}
+
+
+def test_record_max_routes_and_exclude():
+    check = TrafficCheck(max_routes=2, exclude=['/health'])
+
+    check.record('/health', 0.01, True)
+    check.record('/a', 0.01, False)
+    check.record('/b', 0.01, False)
+    check.record('/c', 0.01, False)
+
+    assert list(check.routes) == ['/a', '/b']
+
+
+def test_record_max_routes_evicts_idle_routes():
+    check = TrafficCheck(max_routes=2, max_age=0.05)
+
+    check.record('/a', 0.01, False)
+    time.sleep(0.06)
+    check.record('/b', 0.01, False)
+    check.record('/c', 0.01, False)
+
+    assert list(check.routes) == ['/b', '/c']
+
+
+@pytest.mark.parametrize('exclude_checkers', [True, False])
+def test_exclude_checker_routes(exclude_checkers):
+    check = TrafficCheck(exclude=['/other'], exclude_checkers=exclude_checkers)
+
+    HealthCheck(app=App(), checks=[check], status_uri='/health/status')
+    ReadyCheck(app=App()).add_check(check)
+
+    if exclude_checkers:
+        assert check.exclude == {'/other', '/health', '/health/status', '/ready'}
+    else:
+        assert check.exclude == {'/other'}
+
+
+@pytest.mark.asyncio
+async def test_run_with_checker():
+    check = TrafficCheck(min_samples=1)
+    checker = HealthCheck(checks=[check], no_cache=True)
+
+    resp = await checker.run(None)
+    assert resp.status == 200
+
+    check.record('/', 0.01, True)
+    resp = await checker.run(None)
+    assert resp.status == 500